@@ -0,0 +1,80 @@
+import argparse
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from minecraft_recipe_renderer.encoding import encode_gif
+
+
+def make_frames(
+    count: int, width: int, height: int, seed: int = 0
+) -> list[Image.Image]:
+    """
+    Frames resembling an animated recipe sheet: a GUI background with item slots, every
+    fifth of which cycles through tag members.
+    """
+    rng = np.random.default_rng(seed)
+    colors = rng.integers(0, 256, (200, 4), dtype=np.uint8)
+    colors[:, 3] = 255
+
+    def item(seed_: int) -> np.ndarray:
+        texture = np.random.default_rng(seed_).integers(0, len(colors), (16, 16))
+        return colors[texture].repeat(4, axis=0).repeat(4, axis=1)
+
+    background = np.zeros((height, width, 4), dtype=np.uint8)
+    background[..., :3] = 198
+    background[..., 3] = 255
+    slots = [
+        (x, y) for y in range(16, height - 64, 96) for x in range(16, width - 64, 96)
+    ]
+
+    frames = []
+    for frame in range(count):
+        pixels = background.copy()
+        for i, (x, y) in enumerate(slots):
+            cycling = i % 5 == 0
+            pixels[y : y + 64, x : x + 64] = item(i * count + frame if cycling else i)
+        frames.append(Image.fromarray(pixels, "RGBA"))
+    return frames
+
+
+def encode_gif_pillow(frames: list[Image.Image], duration: int) -> bytes:
+    """
+    The previous encoder, letting Pillow quantize and diff the frames.
+    """
+    buffer = io.BytesIO()
+    frames[0].save(
+        buffer,
+        format="GIF",
+        save_all=True,
+        append_images=frames[1:],
+        duration=duration,
+        loop=0,
+    )
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the GIF encoders, run as python -m benchmarks.encode_gif."
+    )
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--width", type=int, default=1536)
+    parser.add_argument("--height", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames, args.width, args.height)
+    for name, encoder in (("pillow", encode_gif_pillow), ("encode_gif", encode_gif)):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            data = encoder(frames, 1000)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:>10}: {min(timings) * 1000:8.1f} ms {len(data):>10} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,102 @@
+import asyncio
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis.asyncio.client import Redis
 
-from minecraft_recipe_renderer.api import setup
+from minecraft_recipe_renderer.api import (
+    setup,
+    preload,
+    prewarm,
+    render_hot_list,
+    touch_dependencies,
+    warmup,
+    generations,
+)
+from minecraft_recipe_renderer.cache_backend import (
+    TieredBackend,
+    MemoryTier,
+    DiskTier,
+    ContentAddressedBackend,
+    canonical_key_builder,
+)
+from minecraft_recipe_renderer.config import (
+    CACHE_MEMORY_BYTES,
+    CACHE_MEMORY_ITEM_BYTES,
+    CACHE_DISK_PATH,
+    CACHE_DISK_BYTES,
+    CACHE_DISK_THRESHOLD,
+    CACHE_INLINE_BYTES,
+    DEPENDENCY_CACHE_BYTES,
+    PRELOAD_VERSIONS,
+    HOT_LIST_SIZE,
+    HOT_LIST_INTERVAL,
+    PREWARM_BLOCKING,
+)
+from minecraft_recipe_renderer.hot_list import HotList
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncIterator[None]:
-    FastAPICache.init(RedisBackend(Redis()), prefix="minecraft-recipe-renderer")
+    redis = Redis()
+    backend = TieredBackend(
+        RedisBackend(redis),
+        memory=MemoryTier(CACHE_MEMORY_BYTES, CACHE_MEMORY_ITEM_BYTES),
+        disk=(
+            DiskTier(Path(CACHE_DISK_PATH), CACHE_DISK_BYTES)
+            if CACHE_DISK_PATH
+            else None
+        ),
+        disk_threshold=CACHE_DISK_THRESHOLD,
+    )
+    FastAPICache.init(
+        ContentAddressedBackend(
+            backend,
+            prefix="minecraft-recipe-renderer:cas",
+            inline_bytes=CACHE_INLINE_BYTES,
+        ),
+        prefix="minecraft-recipe-renderer",
+        key_builder=canonical_key_builder,
+    )
+
+    generations.redis = redis
+
+    # Only needed when other workers may evict the shared dependency cache
+    touching = (
+        asyncio.create_task(touch_dependencies()) if DEPENDENCY_CACHE_BYTES else None
+    )
+
+    if HOT_LIST_SIZE:
+        warmup.hot_list = HotList(
+            redis, "minecraft-recipe-renderer:hot", HOT_LIST_SIZE, HOT_LIST_INTERVAL
+        )
+
+    task = None
+    if PRELOAD_VERSIONS or warmup.hot_list:
+        if PREWARM_BLOCKING:
+            # Only the preloading holds back traffic, the hot list renders in the background
+            await preload(PRELOAD_VERSIONS)
+            if warmup.hot_list:
+                task = asyncio.create_task(render_hot_list(warmup.hot_list))
+        else:
+            # Not ready until the background preloading finished
+            warmup.ready = False
+            task = asyncio.create_task(prewarm(PRELOAD_VERSIONS, warmup.hot_list))
+
     yield
 
+    for t in (task, touching):
+        if t is not None:
+            t.cancel()
+
+    if warmup.hot_list:
+        # Write what is still buffered
+        await warmup.hot_list.flush()
+
 
 app = FastAPI(lifespan=lifespan)
 
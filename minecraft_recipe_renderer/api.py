@@ -1,20 +1,72 @@
 import asyncio
+import base64
+import collections
+import hashlib
 import io
+import json
 import re
+import struct
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
 
 from PIL import Image
-from cachetools import cached, TTLCache
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 from fastapi import Query, FastAPI
-from fastapi_cache import Coder
+from fastapi_cache import Coder, FastAPICache
 from fastapi_cache.decorator import cache
+from pydantic import BaseModel, Field
 from starlette.requests import Request
-from starlette.responses import Response, HTMLResponse
+from starlette.responses import (
+    Response,
+    HTMLResponse,
+    JSONResponse,
+    StreamingResponse,
+)
 from starlette.staticfiles import StaticFiles
 from starlette.templating import Jinja2Templates
 
 from minecraft_recipe_renderer import ResourceManager, ItemRenderer, Canvas, Item
-from minecraft_recipe_renderer.resource_manager import sanitize_url
+from minecraft_recipe_renderer.config import (
+    MANAGER_CACHE_BYTES,
+    MANAGER_CACHE_TTL,
+    PINNED_VERSIONS,
+    MANAGER_RETRY_DELAY,
+    MANAGER_MAX_RETRY_DELAY,
+    NEGATIVE_CACHE_TTL,
+    ENCODING_PROFILE,
+    STREAM_ENCODING_PROFILE,
+    RENDER_THREADS,
+    RENDER_WINDOW,
+    TEXTURE_ATLAS,
+    DEPENDENCY_CACHE_BYTES,
+    DOWNLOAD_THREADS,
+    GENERATION_TTL,
+)
+from minecraft_recipe_renderer.cache_backend import negative_cache
+from minecraft_recipe_renderer.disk_cache import DiskCache
+from minecraft_recipe_renderer.classes.canvas import get_font
+from minecraft_recipe_renderer.encoding import (
+    STREAMING_FORMATS,
+    encode_animation,
+    encode_image,
+    media_type,
+    negotiate_format,
+    stream_gif,
+    stream_png,
+)
+from minecraft_recipe_renderer.generations import Generations
+from minecraft_recipe_renderer.hot_list import HotList
+from minecraft_recipe_renderer.manager_cache import ManagerCache
+from minecraft_recipe_renderer.recipes.recipe import FAILED_PLAN
+from minecraft_recipe_renderer.resource_manager import (
+    known_dependencies,
+    parse_dependencies,
+    sanitize_url,
+)
 from minecraft_recipe_renderer.utils import to_location
 
 
@@ -28,79 +80,148 @@ class BytesCoder(Coder):
         return value
 
 
-known_dependencies = {
-    "1.20.1": "https://piston-data.mojang.com/v1/objects/a7e5a6024bfd3cd614625aa05629adf760020304/client.jar"
-}
+class AtlasCoder(Coder):
+    """
+    Stores an image together with JSON metadata, like an atlas' sprite map, in a single cache entry.
+    """
 
+    @classmethod
+    def encode(cls, value: tuple[bytes, dict]) -> bytes:
+        image, sprites = value
+        return struct.pack(">I", len(image)) + image + json.dumps(sprites).encode()
 
-@cached(
-    cache=TTLCache(maxsize=8, ttl=21600), key=lambda dependencies: str(dependencies)
+    @classmethod
+    def decode(cls, value: bytes) -> tuple[bytes, dict]:
+        (length,) = struct.unpack(">I", value[:4])
+        return value[4 : 4 + length], json.loads(value[4 + length :])
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+render_pool = ThreadPoolExecutor(
+    max_workers=RENDER_THREADS, thread_name_prefix="recipe-render"
 )
-def load_manager(dependencies: list[str]) -> ResourceManager:
-    manager = ResourceManager(Path("cache/mcr/"))
-    for dep in dependencies:
-        manager.load_dependency(dep)
-    manager.post_load()
-    return manager
 
+# Pages break once a row would start below this height
+MAX_SHEET_HEIGHT = 8192
+MAX_ANIMATED_SHEET_HEIGHT = 2048
 
-def encode_image(texture: Image.Image) -> bytes:
-    buffer = io.BytesIO()
-    texture.save(buffer, format="PNG")
-    return buffer.getvalue()
+manager_cache = ManagerCache(
+    MANAGER_CACHE_BYTES,
+    MANAGER_CACHE_TTL,
+    retry_delay=MANAGER_RETRY_DELAY,
+    max_retry_delay=MANAGER_MAX_RETRY_DELAY,
+    pinned=[str([sanitize_url(known_dependencies.get(v, v))]) for v in PINNED_VERSIONS],
+)
 
 
-def render_item(location: str, dependencies: list[str], resolution: int) -> bytes:
-    # Load resources
-    manager = load_manager(dependencies)
-    renderer = ItemRenderer(manager)
+# Loaded managers read files lazily, so their dependencies are kept while they are loaded
+# and, for other workers, for at least the TTL since they were last touched
+dependency_cache = DiskCache(
+    Path("cache/mcr/"),
+    DEPENDENCY_CACHE_BYTES,
+    min_age=MANAGER_CACHE_TTL,
+    in_use=lambda: [s.name for m in manager_cache.managers() for s in m.sources],
+)
+
+
+# Reload counters of the dependency sets, shared by all workers once Redis is attached
+generations = Generations("minecraft-recipe-renderer:generations", GENERATION_TTL)
 
+
+def load_manager(dependencies: list[str], generation: int = 0) -> ResourceManager:
+    """
+    :param generation: The generation the manager must be up to date with.
+    """
+
+    def load() -> ResourceManager:
+        manager = ResourceManager(
+            dependency_cache.root,
+            texture_atlas=TEXTURE_ATLAS,
+            disk_cache=dependency_cache,
+        )
+        manager.load_dependencies(dependencies, workers=DOWNLOAD_THREADS)
+        manager.post_load()
+        return manager
+
+    manager = manager_cache.get(str(dependencies), load, generation)
+    manager.touch()
+    return manager
+
+
+def render_item_image(
+    manager: ResourceManager, renderer: ItemRenderer, location: str, resolution: int
+) -> Image.Image:
     model = manager.get_model(location)
     if not model:
         raise ValueError(f"Unknown item model: {location}")
 
-    texture = renderer.render(model, resolution)
+    return renderer.render(model, resolution)
 
-    return encode_image(texture)
 
-
-@cache(expire=21600, coder=BytesCoder())
-async def cached_render_item(
-    locations: str, dependencies: list[str], resolution: int
+def render_item(
+    location: str,
+    dependencies: list[str],
+    generation: int,
+    resolution: int,
+    image_format: str = "png",
 ) -> bytes:
-    return await asyncio.to_thread(render_item, locations, dependencies, resolution)
+    # Load resources
+    manager = load_manager(dependencies, generation)
+    renderer = ItemRenderer(manager)
 
+    texture = render_item_image(manager, renderer, location, resolution)
 
-def render_atlas(
+    return encode_image(texture, image_format, ENCODING_PROFILE)
+
+
+@negative_cache(ttl=NEGATIVE_CACHE_TTL)
+@cache(expire=21600, coder=BytesCoder())
+async def cached_render_item(
     locations: str,
     dependencies: list[str],
+    generation: int,
     resolution: int,
-    row_size: int,
-    background: str,
+    image_format: str,
 ) -> bytes:
-    # Load resources
-    manager = load_manager(dependencies)
-    renderer = ItemRenderer(manager)
+    return await asyncio.to_thread(
+        render_item, locations, dependencies, generation, resolution, image_format
+    )
 
-    # Convert and filter
-    locations = [
+
+def expand_locations(manager: ResourceManager, locations: list[str]) -> list[str]:
+    """
+    Expand tags and drop every location without an item model.
+    """
+    expanded = [
         (
             sorted(manager.tags.get(location[1:], []))
             if (location.startswith("#") or location.startswith("_"))
             else [location]
         )
-        for location in [to_location(location) for location in locations.split(";")]
+        for location in [to_location(location) for location in locations]
     ]
-    locations = [
+    return [
         location
-        for sublist in locations
+        for sublist in expanded
         for location in sublist
         if manager.get_model(location)
     ]
 
-    if len(locations) == 0:
-        raise ValueError(f"Not a single model found: {locations}")
 
+def build_atlas(
+    manager: ResourceManager,
+    renderer: ItemRenderer,
+    locations: list[str],
+    resolution: int,
+    row_size: int,
+    background: str,
+) -> tuple[Image.Image, dict[str, tuple[int, int, int, int]]]:
+    """
+    Lay out the items on a grid.
+    :return: The atlas image and the pixel rectangle (x, y, width, height) of each item.
+    """
     # Create atlas canvas
     cols = min(row_size, len(locations))
     rows = (len(locations) + row_size - 1) // row_size
@@ -116,6 +237,7 @@ def render_atlas(
         canvas.box("menu", 0, 0, canvas.width, canvas.height)
 
     # Render slots
+    rects = {}
     for i, location in enumerate(locations):
         x = (i % cols) * (16 + margin * 2) + border
         y = (i // cols) * (16 + margin * 2) + border
@@ -124,133 +246,636 @@ def render_atlas(
             if background != "none":
                 canvas.box("slot", x, y, 16 + margin * 2, 16 + margin * 2)
             canvas.item(renderer, Item(location), x + margin, y + margin)
+            rects.setdefault(
+                location,
+                (
+                    (x + margin) * canvas.resolution,
+                    (y + margin) * canvas.resolution,
+                    16 * canvas.resolution,
+                    16 * canvas.resolution,
+                ),
+            )
 
-    return encode_image(canvas.image)
+    return canvas.image, rects
 
 
-@cache(expire=21600, coder=BytesCoder())
+def render_atlas(
+    locations: str,
+    dependencies: list[str],
+    generation: int,
+    resolution: int,
+    row_size: int,
+    background: str,
+    image_format: str = "png",
+) -> tuple[bytes, dict[str, tuple[int, int, int, int]]]:
+    # Load resources
+    manager = load_manager(dependencies, generation)
+    renderer = ItemRenderer(manager)
+
+    # Convert and filter
+    locations = expand_locations(manager, locations.split(";"))
+
+    if len(locations) == 0:
+        raise ValueError(f"Not a single model found: {locations}")
+
+    image, sprites = build_atlas(
+        manager, renderer, locations, resolution, row_size, background
+    )
+
+    return encode_image(image, image_format, ENCODING_PROFILE), sprites
+
+
+@negative_cache(ttl=NEGATIVE_CACHE_TTL)
+@cache(expire=21600, coder=AtlasCoder())
 async def cached_render_atlas(
     locations: str,
     dependencies: list[str],
+    generation: int,
     resolution: int,
     row_size: int,
     background: str,
-) -> bytes:
+    image_format: str,
+) -> tuple[bytes, dict[str, tuple[int, int, int, int]]]:
     return await asyncio.to_thread(
-        render_atlas, locations, dependencies, resolution, row_size, background
+        render_atlas,
+        locations,
+        dependencies,
+        generation,
+        resolution,
+        row_size,
+        background,
+        image_format,
     )
 
 
-def render_recipes(
-    locations: str,
+def render_batch(
+    locations: list[str],
     dependencies: list[str],
+    generation: int,
     resolution: int,
-    row_width: int,
-    animated: bool,
-    max_variations: int = 10,
+    output_format: str,
+    row_size: int,
 ) -> bytes:
-    # Load resources
-    manager = load_manager(dependencies)
+    # Load resources once for all items
+    manager = load_manager(dependencies, generation)
     renderer = ItemRenderer(manager)
 
-    locations = [to_location(location) for location in locations.split(";")]
-    filtered_locations = []
-    for name in manager.recipes.keys():
-        for location in locations:
-            if re.match(location, name):
-                filtered_locations.append(name)
-                break
+    locations = list(dict.fromkeys(expand_locations(manager, locations)))
+
+    if len(locations) == 0:
+        raise ValueError(f"Not a single model found: {locations}")
+
+    if output_format == "sprites":
+        image, rects = build_atlas(
+            manager, renderer, locations, resolution, row_size, "none"
+        )
+        return json.dumps(
+            {
+                "image": base64.b64encode(
+                    encode_image(image, "png", ENCODING_PROFILE)
+                ).decode(),
+                "width": image.width,
+                "height": image.height,
+                "sprites": rects,
+            }
+        ).encode()
+    elif output_format == "zip":
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            for location in locations:
+                texture = render_item_image(manager, renderer, location, resolution)
+                archive.writestr(
+                    location.replace(":", "/") + ".png",
+                    encode_image(texture, "png", ENCODING_PROFILE),
+                )
+        return buffer.getvalue()
+    else:
+        raise ValueError(f"Unknown batch format: {output_format}")
+
+
+@negative_cache(ttl=NEGATIVE_CACHE_TTL)
+@cache(expire=21600, coder=BytesCoder())
+async def cached_render_batch(
+    locations: list[str],
+    dependencies: list[str],
+    generation: int,
+    resolution: int,
+    output_format: str,
+    row_size: int,
+) -> bytes:
+    return await asyncio.to_thread(
+        render_batch,
+        locations,
+        dependencies,
+        generation,
+        resolution,
+        output_format,
+        row_size,
+    )
+
+
+class SheetRow:
+    def __init__(self, y: int):
+        self.y = y
+        self.height = 0
+        # Recipe name, x offset and number of variations, zero for a placeholder
+        self.recipes: list[tuple[str, int, int]] = []
+
+
+class SheetLayout:
+    """
+    The placement of recipes on one page, computed from their sizes before anything is rendered.
+    """
+
+    def __init__(self, resolution: int, print_name: bool):
+        self.resolution = resolution
+        self.print_name = print_name
+        self.rows: list[SheetRow] = []
+        self.width = 0
+        self.height = 0
+        self.frames = 1
+
+
+def match_recipes(
+    manager: ResourceManager, locations: str, outputs: str = "", uses: str = ""
+) -> list[str]:
+    """
+    Find recipes by name pattern, by what they produce or by what they consume.
+    :param locations: Semicolon separated recipe names, which can be regex patterns.
+    :param outputs: Semicolon separated items, matching recipes producing any of them.
+    :param uses: Semicolon separated items or #tags, matching recipes consuming any of them.
+    """
+    filtered_locations = set()
+
+    if locations:
+        locations = [to_location(location) for location in locations.split(";")]
+        for name in manager.recipes.keys():
+            for location in locations:
+                if re.match(location, name):
+                    filtered_locations.add(name)
+                    break
+
+    for item in filter(None, outputs.split(";")):
+        filtered_locations.update(manager.recipes_by_output.get(item, ()))
+    for item in filter(None, uses.split(";")):
+        filtered_locations.update(manager.recipes_using(item))
 
     if not filtered_locations:
         raise ValueError("No recipe matched.")
 
     # Sort for consistent results
-    filtered_locations = sorted(filtered_locations)
+    return sorted(filtered_locations)
 
-    # Render recipes
+
+def _layout_key(manager: ResourceManager, *args, **kwargs) -> tuple:
+    # The fingerprint identifies the loaded content, reloaded managers get new layouts
+    return hashkey(manager.fingerprint, *args, **kwargs)
+
+
+@cached(
+    cache=TTLCache(maxsize=256, ttl=MANAGER_CACHE_TTL),
+    key=_layout_key,
+    lock=threading.Lock(),
+)
+def layout_recipes(
+    manager: ResourceManager,
+    locations: str,
+    resolution: int,
+    row_width: int,
+    animated: bool,
+    max_variations: int,
+    outputs: str = "",
+    uses: str = "",
+) -> list[SheetLayout]:
+    """
+    Split the matched recipes into pages, rows wrap at the row width and
+    pages break once a row would start below the height limit.
+    The layout only depends on recipe sizes and is shared by all pages of a query.
+    """
+    names = match_recipes(manager, locations, outputs, uses)
+    max_height = MAX_ANIMATED_SHEET_HEIGHT if animated else MAX_SHEET_HEIGHT
+
+    pages = [SheetLayout(resolution, print_name=len(names) > 1)]
+    row = SheetRow(0)
+    pages[-1].rows.append(row)
     x = 0
-    y = 0
-    w = 0
-    h = 0
-    last_h = 0
-    images = []
-    for location in filtered_locations:
-        recipe = manager.recipes[location]
-        image = recipe.render(
+    for name in names:
+        recipe = manager.recipes[name]
+        if recipe.get_plan(manager) is FAILED_PLAN:
+            # Already logged when compiling
+            continue
+        variations = min(
+            max_variations if animated else 1, recipe.get_variations(manager)
+        )
+        if variations:
+            width, height = (s * (resolution // 16) for s in recipe.get_size())
+        else:
+            width, height = 16, 16
+
+        if x + width > row_width and x > 0:
+            x = 0
+            y = row.y + row.height
+            if y > max_height:
+                pages.append(SheetLayout(resolution, print_name=len(names) > 1))
+                y = 0
+            row = SheetRow(y)
+            pages[-1].rows.append(row)
+
+        layout = pages[-1]
+        row.recipes.append((name, x, variations))
+        row.height = max(row.height, height)
+        layout.width = max(layout.width, x + width)
+        layout.height = max(layout.height, row.y + height)
+        layout.frames = max(layout.frames, variations)
+
+        x += width
+
+    # A single recipe is rendered on its own
+    if len(names) == 1:
+        pages[0].frames = 1
+
+    return pages
+
+
+def load_page(
+    locations: str,
+    dependencies: list[str],
+    generation: int,
+    resolution: int,
+    row_width: int,
+    animated: bool,
+    page: int,
+    max_variations: int = 10,
+    outputs: str = "",
+    uses: str = "",
+) -> tuple[ResourceManager, SheetLayout, int]:
+    """
+    :return: The manager, the layout of the requested page and the total number of pages.
+    """
+    manager = load_manager(dependencies, generation)
+    pages = layout_recipes(
+        manager,
+        locations,
+        resolution,
+        row_width,
+        animated,
+        max_variations,
+        outputs=outputs,
+        uses=uses,
+    )
+    if not 1 <= page <= len(pages):
+        raise ValueError(f"Page {page} does not exist, there are {len(pages)} pages.")
+    return manager, pages[page - 1], len(pages)
+
+
+def render_ordered(
+    func: Callable[[T], R], items: Iterable[T], window: int = RENDER_WINDOW
+) -> Iterator[R]:
+    """
+    Map items on the shared render pool and yield the results in order.
+    At most `window` items are in flight, leaving the rest of the pool to other requests.
+    Must not be called from within the pool itself.
+    """
+    pending = collections.deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(render_pool.submit(func, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_row(
+    layout: SheetLayout, renderer: ItemRenderer, row: SheetRow, frame: int
+) -> Image.Image:
+    def render(entry: tuple[str, int, int]) -> Image.Image:
+        name, _, variations = entry
+        return renderer.resource_manager.recipes[name].render_variation(
             renderer,
-            resolution // 16,
-            max_variations=max_variations if animated else 1,
-            print_name=len(filtered_locations) > 1,
+            layout.resolution // 16,
+            frame % variations,
+            print_name=layout.print_name,
         )
 
-        if not image:
-            image.append(Image.new("RGBA", (16, 16), color=(0, 0, 0, 0)))
+    band = Image.new("RGBA", (layout.width, row.height), color=(0, 0, 0, 0))
+    entries = [entry for entry in row.recipes if entry[2]]
+    for (_, x, _), image in zip(entries, render_ordered(render, entries)):
+        band.paste(image, (x, 0))
+    return band
 
-        size = image[0].size
-        if x + size[0] > row_width and x > 0:
-            x = 0
-            y += last_h
-            last_h = 0
-            if y > (2048 if animated else 8192):
-                break
 
-        images.append((image, x, y))
+def render_frames(layout: SheetLayout, manager: ResourceManager) -> list[Image.Image]:
+    """
+    Render all frames at once, each recipe is only rendered once per variation.
+    Recipes are rendered in parallel but pasted in layout order.
+    """
+    renderer = ItemRenderer(manager)
 
-        w = max(w, x + size[0])
-        h = max(h, y + size[1])
-        last_h = max(last_h, size[1])
+    def render(entry: tuple[int, int, str, int]) -> list[Image.Image]:
+        _, _, name, variations = entry
+        return manager.recipes[name].render(
+            renderer,
+            layout.resolution // 16,
+            max_variations=variations,
+            print_name=layout.print_name,
+        )
+
+    atlases = [
+        Image.new("RGBA", (layout.width, layout.height), color=(0, 0, 0, 0))
+        for _ in range(layout.frames)
+    ]
+    entries = [
+        (x, row.y, name, variations)
+        for row in layout.rows
+        for name, x, variations in row.recipes
+        if variations
+    ]
+    for (x, y, _, _), images in zip(entries, render_ordered(render, entries)):
+        for frame, atlas in enumerate(atlases):
+            if images:
+                atlas.paste(images[frame % len(images)], (x, y))
+    return atlases
 
-        x += size[0]
 
-    if len(images) == 1:
-        atlases = [i[0][0] for i in images]
+def stream_recipes(
+    layout: SheetLayout, manager: ResourceManager, animated: bool
+) -> Iterator[bytes]:
+    """
+    Encode the sheet while it is composed, row by row for images and frame by frame for animations.
+    Animations render every recipe once per frame to avoid holding more than a single frame.
+    """
+    renderer = ItemRenderer(manager)
+    if animated:
+
+        def frames():
+            for frame in range(layout.frames):
+                atlas = Image.new(
+                    "RGBA", (layout.width, layout.height), color=(0, 0, 0, 0)
+                )
+                for row in layout.rows:
+                    atlas.paste(render_row(layout, renderer, row, frame), (0, row.y))
+                yield atlas
+
+        return stream_gif(layout.width, layout.height, frames(), duration=1000)
     else:
-        atlases = []
-        max_variations = max([len(recipe[0]) for recipe in images])
-        for variation in range(max_variations):
-            atlas = Image.new(
-                "RGBA",
-                (w, h),
-                color=(0, 0, 0, 0),
-            )
-            for image, x, y in images:
-                atlas.paste(image[variation % len(image)], (x, y))
-            atlases.append(atlas)
+        bands = (render_row(layout, renderer, row, 0) for row in layout.rows)
+        return stream_png(layout.width, layout.height, bands, STREAM_ENCODING_PROFILE)
+
+
+def render_recipes(
+    locations: str,
+    dependencies: list[str],
+    generation: int,
+    resolution: int,
+    row_width: int,
+    animated: bool,
+    page: int = 1,
+    max_variations: int = 10,
+    image_format: str = "png",
+    outputs: str = "",
+    uses: str = "",
+) -> tuple[bytes, dict]:
+    manager, layout, pages = load_page(
+        locations,
+        dependencies,
+        generation,
+        resolution,
+        row_width,
+        animated,
+        page,
+        max_variations,
+        outputs=outputs,
+        uses=uses,
+    )
 
+    atlases = render_frames(layout, manager)
     if animated:
-        buffer = io.BytesIO()
-        atlases[0].save(
-            buffer,
-            format="GIF",
-            save_all=True,
-            append_images=atlases[1:],
-            duration=1000,
-            loop=0,
+        result = encode_animation(
+            atlases, image_format, duration=1000, profile=ENCODING_PROFILE
         )
-        return buffer.getvalue()
     else:
-        return encode_image(atlases[0])
+        result = encode_image(atlases[0], image_format, ENCODING_PROFILE)
+    return result, {"pages": pages}
 
 
-@cache(expire=21600, coder=BytesCoder())
+@negative_cache(ttl=NEGATIVE_CACHE_TTL)
+@cache(expire=21600, coder=AtlasCoder())
 async def cached_render_recipes(
     locations: str,
     dependencies: list[str],
+    generation: int,
     resolution: int,
     row_width: int,
     animated: bool,
-) -> bytes:
+    page: int,
+    image_format: str,
+    outputs: str = "",
+    uses: str = "",
+) -> tuple[bytes, dict]:
     return await asyncio.to_thread(
-        render_recipes, locations, dependencies, resolution, row_width, animated
+        render_recipes,
+        locations,
+        dependencies,
+        generation,
+        resolution,
+        row_width,
+        animated,
+        page,
+        image_format=image_format,
+        outputs=outputs,
+        uses=uses,
     )
 
 
-def parse_dependencies(minecraft_version: str, dependencies: str) -> list[str]:
-    return [
-        sanitize_url(known_dependencies[d] if d in known_dependencies else d.strip())
-        for d in (dependencies.split(";") + [minecraft_version])
-        if d.strip()
-    ]
+def sprites_to_css(sprites: dict[str, list[int]], url: str) -> str:
+    lines = [f'.mcr-sprite {{ background-image: url("{url}"); }}']
+    for location, (x, y, w, h) in sprites.items():
+        name = location.replace(":", "-").replace("/", "-")
+        lines.append(
+            f".mcr-{name} {{ background-position: -{x}px -{y}px; width: {w}px; height: {h}px; }}"
+        )
+    return "\n".join(lines) + "\n"
+
+
+class BatchRequest(BaseModel):
+    locations: list[str] = Field(
+        min_length=1,
+        max_length=1024,
+        description="The resource locations of the items or tags to render.",
+    )
+    minecraft_version: str = Field(
+        default="1.20.1",
+        description="The version of Minecraft to use as the primary dependency.",
+    )
+    dependencies: str = Field(
+        default="",
+        description="A semicolon separated list of dependencies, given as repository or JAR URLs.",
+    )
+    resolution: int = Field(
+        default=16,
+        ge=16,
+        le=256,
+        description="The resolution of each item, a multiple of 16.",
+    )
+    format: str = Field(
+        default="zip",
+        description="Either 'zip' for a zip of PNGs or 'sprites' for a sprite sheet with offsets.",
+    )
+    row_size: int = Field(
+        default=32,
+        ge=1,
+        description="The number of items per row of the sprite sheet.",
+    )
+
+
+def normalize_locations(locations: str, ordered: bool = True) -> str:
+    """
+    Canonicalize a semicolon separated location list so equivalent requests share keys.
+    :param ordered: Whether the order matters, otherwise duplicates are dropped and sorted.
+    """
+    parts = [to_location(p.strip()) for p in locations.split(";") if p.strip()]
+    return ";".join(parts if ordered else sorted(set(parts)))
+
+
+def dependency_fingerprint(dependencies: list[str]) -> str:
+    return hashlib.sha256(json.dumps(dependencies).encode()).hexdigest()
+
+
+def make_etag(endpoint: str, dependencies: list[str], **params) -> str:
+    """
+    Derive a strong ETag from the dependencies and the normalized request parameters.
+    Ignored parameters like the cache breaker must not be passed.
+    """
+    key = json.dumps(
+        [endpoint, dependency_fingerprint(dependencies), params], sort_keys=True
+    )
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (t.strip().removeprefix("W/") for t in header.split(","))
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {
+        "Cache-Control": "public, max-age=21600, immutable",
+        "ETag": etag,
+        "Vary": "Accept",
+    }
+
+
+class Warmup:
+    """
+    Startup state of the worker, ready once the configured dependency sets are loaded.
+    The recorded hot renders are cached afterwards, without holding back readiness.
+    """
+
+    def __init__(self):
+        self.hot_list: Optional[HotList] = None
+        self.ready = True
+        self.rendering = False
+        self.loaded = 0
+        self.rendered = 0
+        self.failed = 0
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "rendering": self.rendering,
+            "loaded": self.loaded,
+            "rendered": self.rendered,
+            "failed": self.failed,
+        }
+
+
+warmup = Warmup()
+
+# Cached renders which can be prepared in advance, by their recorded endpoint
+PREWARM_RENDERERS = {
+    "item": cached_render_item,
+    "atlas": cached_render_atlas,
+    "recipes": cached_render_recipes,
+}
+
+
+def record_render(endpoint: str, **params):
+    """
+    Remember a successful cached render, with the arguments of its render function.
+    Requests never wait for Redis, the hot list writes its records in batches.
+    """
+    if warmup.hot_list is not None:
+        warmup.hot_list.record(endpoint, params)
+
+
+async def preload(versions: list[str]):
+    """
+    Prepare a fresh worker: fetch the font and load the dependency sets of the given
+    Minecraft versions. The worker is ready afterwards.
+    """
+    warmup.ready = False
+    try:
+        try:
+            await asyncio.to_thread(get_font)
+        except Exception as e:
+            print(f"Failed to load font: {e}")
+
+        for version in versions:
+            try:
+                await asyncio.to_thread(load_manager, parse_dependencies(version, ""))
+                warmup.loaded += 1
+            except ValueError as e:
+                print(f"Failed to preload {version}: {e}")
+    finally:
+        warmup.ready = True
+
+
+async def render_hot_list(hot_list: HotList):
+    """
+    Render the recently requested renders into the cache, one after another.
+    """
+    warmup.rendering = True
+    try:
+        for endpoint, params in await hot_list.top():
+            if endpoint not in PREWARM_RENDERERS:
+                continue
+            try:
+                location = params["locations"] if endpoint == "item" else None
+                generation = await generations.get(
+                    str(params["dependencies"]), location
+                )
+                await PREWARM_RENDERERS[endpoint](generation=generation, **params)
+                warmup.rendered += 1
+            except Exception as e:
+                warmup.failed += 1
+                print(f"Failed to prewarm {endpoint} {params}: {e}")
+    finally:
+        warmup.rendering = False
+
+
+async def prewarm(versions: list[str], hot_list: Optional[HotList] = None):
+    """
+    Preload the given versions, then render the hot list if there is one.
+    """
+    await preload(versions)
+    if hot_list is not None:
+        await render_hot_list(hot_list)
+
+
+async def touch_dependencies():
+    """
+    Periodically mark the dependencies of all loaded managers as in use. Other workers
+    sharing the dependency cache only see when entries were last used, so idle but loaded
+    managers would otherwise lose their files.
+    """
+    while True:
+        await asyncio.sleep(dependency_cache.min_age / 4)
+        for manager in manager_cache.managers():
+            await asyncio.to_thread(manager.touch)
 
 
 def setup(app: FastAPI):
@@ -268,11 +893,74 @@ def setup(app: FastAPI):
             return Response(status_code=404)
         return templates.TemplateResponse(request=request, name=f"{page}.html")
 
+    @app.get("/health")
+    async def get_health() -> JSONResponse:
+        return JSONResponse({"status": "ok"})
+
+    @app.get("/ready")
+    async def get_ready() -> JSONResponse:
+        return JSONResponse(warmup.stats(), status_code=200 if warmup.ready else 503)
+
+    @app.get("/stats/managers")
+    async def get_manager_stats() -> JSONResponse:
+        return JSONResponse(manager_cache.stats())
+
+    @app.get("/stats/cache")
+    async def get_cache_stats() -> JSONResponse:
+        backend = FastAPICache.get_backend()
+        return JSONResponse(backend.stats() if hasattr(backend, "stats") else {})
+
+    @app.post("/reload")
+    async def post_reload(
+        minecraft_version: str = Query(
+            default="1.20.1",
+            title="Minecraft Version",
+            description="The version of Minecraft to use as the primary dependency.",
+        ),
+        dependencies: str = Query(
+            default="",
+            title="Dependencies",
+            description="A semicolon separated list of dependencies, given as repository or JAR URLs.",
+        ),
+    ) -> Response:
+        """
+        Fetch the dependencies again and start a new generation of their renders.
+        If this worker has the set loaded, only the changed files are applied and cached
+        renders of unaffected items stay valid. Other workers catch up on their next render.
+        """
+        try:
+            parsed_dependencies = parse_dependencies(minecraft_version, dependencies)
+            key = str(parsed_dependencies)
+            reloaded = await asyncio.to_thread(manager_cache.reload, key)
+            if reloaded is None:
+                # Without a previous version the changes are unknown, all renders are outdated
+                await asyncio.to_thread(load_manager, parsed_dependencies)
+                changed = None
+            else:
+                previous, manager = reloaded
+                if manager is previous:
+                    return JSONResponse(
+                        {"generation": await generations.get(key), "changed": 0}
+                    )
+                changed = await asyncio.to_thread(manager.changed_items, previous)
+        except ValueError as e:
+            return Response(status_code=422, content=str(e))
+
+        generation = await generations.bump(key, changed)
+        manager_cache.advance(key, generation)
+        return JSONResponse(
+            {
+                "generation": generation,
+                "changed": None if changed is None else len(changed),
+            }
+        )
+
     @app.get(
         "/item",
-        responses={200: {"content": {"image/png": {}}}},
+        responses={200: {"content": {"image/png": {}, "image/webp": {}}}},
     )
     async def get_item(
+        request: Request,
         location: str = Query(
             title="Resource Location",
             description="The resource location of the item or tag to render. "
@@ -301,6 +989,13 @@ def setup(app: FastAPI):
             title="Resolution",
             description="The resolution of the image, a multiple of 16.",
         ),
+        image_format: str = Query(
+            default="",
+            alias="format",
+            title="Image Format",
+            description="The image format, 'png' or 'webp'. "
+            "If omitted, it is negotiated from the Accept header.",
+        ),
         _c: int = Query(
             default=0,
             title="Cache Breaker",
@@ -312,22 +1007,57 @@ def setup(app: FastAPI):
 
         try:
             parsed_dependencies = parse_dependencies(minecraft_version, dependencies)
+            location = normalize_locations(location)
+            image_format = negotiate_format(
+                image_format, request.headers.get("accept"), False
+            )
 
-            result = await cached_render_item(location, parsed_dependencies, resolution)
+            generation = await generations.get(str(parsed_dependencies), location)
+            etag = make_etag(
+                "item",
+                parsed_dependencies,
+                generation=generation,
+                location=location,
+                resolution=resolution,
+                format=image_format,
+            )
+            if is_not_modified(request, etag):
+                return Response(status_code=304, headers=cache_headers(etag))
+
+            result = await cached_render_item(
+                location, parsed_dependencies, generation, resolution, image_format
+            )
+            record_render(
+                "item",
+                locations=location,
+                dependencies=parsed_dependencies,
+                resolution=resolution,
+                image_format=image_format,
+            )
         except ValueError as e:
             return Response(status_code=422, content=str(e))
 
         return Response(
             content=result,
-            media_type="image/png",
-            headers={"Cache-Control": "public, max-age=21600, immutable"},
+            media_type=media_type(image_format, False),
+            headers=cache_headers(etag),
         )
 
     @app.get(
         "/atlas",
-        responses={200: {"content": {"image/png": {}}}},
+        responses={
+            200: {
+                "content": {
+                    "image/png": {},
+                    "image/webp": {},
+                    "application/json": {},
+                    "text/css": {},
+                }
+            }
+        },
     )
     async def get_atlas(
+        request: Request,
         locations: str = Query(
             title="Resource Locations",
             description="A comma separated list of resource locations and tags to render. ",
@@ -365,6 +1095,20 @@ def setup(app: FastAPI):
             title="Background Style",
             description="The style of the background, can be 'none', 'simple', or 'fancy'.",
         ),
+        sprite_map: str = Query(
+            default="",
+            alias="map",
+            title="Sprite Map",
+            description="Return the pixel rectangle of each item instead of the image, "
+            "either as 'json' or as 'css' sprite classes.",
+        ),
+        image_format: str = Query(
+            default="",
+            alias="format",
+            title="Image Format",
+            description="The image format, 'png' or 'webp'. "
+            "If omitted, it is negotiated from the Accept header.",
+        ),
         _c: int = Query(
             default=0,
             title="Cache Breaker",
@@ -376,25 +1120,132 @@ def setup(app: FastAPI):
 
         try:
             parsed_dependencies = parse_dependencies(minecraft_version, dependencies)
+            locations = normalize_locations(locations)
+            image_format = negotiate_format(
+                image_format, request.headers.get("accept"), False
+            )
+
+            generation = await generations.get(str(parsed_dependencies))
+            etag = make_etag(
+                "atlas",
+                parsed_dependencies,
+                generation=generation,
+                locations=locations,
+                resolution=resolution,
+                row_size=row_size,
+                background=background,
+                map=sprite_map,
+                format=image_format,
+            )
+            if is_not_modified(request, etag):
+                return Response(status_code=304, headers=cache_headers(etag))
 
-            result = await cached_render_atlas(
-                locations, parsed_dependencies, resolution, row_size, background
+            result, sprites = await cached_render_atlas(
+                locations,
+                parsed_dependencies,
+                generation,
+                resolution,
+                row_size,
+                background,
+                image_format,
+            )
+            record_render(
+                "atlas",
+                locations=locations,
+                dependencies=parsed_dependencies,
+                resolution=resolution,
+                row_size=row_size,
+                background=background,
+                image_format=image_format,
             )
         except ValueError as e:
             return Response(status_code=422, content=str(e))
 
+        headers = cache_headers(etag)
+        if sprite_map == "json":
+            return JSONResponse(sprites, headers=headers)
+        elif sprite_map == "css":
+            url = request.url.remove_query_params("map")
+            return Response(
+                content=sprites_to_css(sprites, str(url)),
+                media_type="text/css",
+                headers=headers,
+            )
+        elif sprite_map:
+            return Response(
+                status_code=422, content=f"Unknown map format: {sprite_map}"
+            )
+
         return Response(
             content=result,
-            media_type="image/png",
-            headers={"Cache-Control": "public, max-age=21600, immutable"},
+            media_type=media_type(image_format, False),
+            headers=headers,
+        )
+
+    @app.post(
+        "/batch",
+        responses={200: {"content": {"application/zip": {}, "application/json": {}}}},
+    )
+    async def post_batch(request: Request, batch: BatchRequest) -> Response:
+        if batch.resolution % 16 != 0:
+            raise ValueError("Resolution must be a multiple of 16.")
+
+        try:
+            parsed_dependencies = parse_dependencies(
+                batch.minecraft_version, batch.dependencies
+            )
+
+            locations = normalize_locations(";".join(batch.locations)).split(";")
+
+            generation = await generations.get(str(parsed_dependencies))
+            etag = make_etag(
+                "batch",
+                parsed_dependencies,
+                generation=generation,
+                locations=locations,
+                resolution=batch.resolution,
+                format=batch.format,
+                row_size=batch.row_size,
+            )
+            if is_not_modified(request, etag):
+                return Response(status_code=304, headers=cache_headers(etag))
+
+            result = await cached_render_batch(
+                locations,
+                parsed_dependencies,
+                generation,
+                batch.resolution,
+                batch.format,
+                batch.row_size,
+            )
+        except ValueError as e:
+            return Response(status_code=422, content=str(e))
+
+        return Response(
+            content=result,
+            media_type=(
+                "application/json" if batch.format == "sprites" else "application/zip"
+            ),
+            headers=cache_headers(etag),
         )
 
     @app.get(
         "/recipes",
-        responses={200: {"content": {"image/png": {}}}},
+        responses={
+            200: {
+                "content": {
+                    "image/png": {},
+                    "image/webp": {},
+                    "image/gif": {},
+                    "image/apng": {},
+                }
+            }
+        },
     )
     async def get_recipes(
+        request: Request,
         locations: str = Query(
+            default="",
             title="Resource Locations",
             description="A comma separated list of recipes. "
             "Recipes can contain regex patterns.",
@@ -402,7 +1253,20 @@ def setup(app: FastAPI):
                 "minecraft:iron_ingot;minecraft:gold_ingot",
                 "minecraft:.*_ingot",
             ],
-            min_length=1,
+        ),
+        output: str = Query(
+            default="",
+            title="Output",
+            description="A semicolon separated list of items, "
+            "adds every recipe producing one of them.",
+            examples=["minecraft:stick"],
+        ),
+        uses: str = Query(
+            default="",
+            title="Uses",
+            description="A semicolon separated list of items or #tags, "
+            "adds every recipe consuming one of them, including via tags.",
+            examples=["minecraft:oak_planks", "#minecraft:planks"],
         ),
         minecraft_version: str = Query(
             default="1.20.1",
@@ -430,9 +1294,29 @@ def setup(app: FastAPI):
         ),
         animated: bool = Query(
             default=False,
-            title="Animated GIF",
+            title="Animated",
             description="Animate the recipe if it has multiple variations.",
         ),
+        image_format: str = Query(
+            default="",
+            alias="format",
+            title="Image Format",
+            description="The image format, 'png' or 'webp', or for animations "
+            "'gif', 'apng', or 'webp'. If omitted, it is negotiated from the Accept header.",
+        ),
+        page: int = Query(
+            default=1,
+            ge=1,
+            title="Page",
+            description="Large sheets are split into pages, the total number of pages "
+            "is returned in the X-Total-Pages header.",
+        ),
+        stream: bool = Query(
+            default=False,
+            title="Stream",
+            description="Send the image while it is rendered instead of caching it, "
+            "useful for very large sheets. Only 'png' and 'gif' can be streamed.",
+        ),
         _c: int = Query(
             default=0,
             title="Cache Breaker",
@@ -444,15 +1328,87 @@ def setup(app: FastAPI):
 
         try:
             parsed_dependencies = parse_dependencies(minecraft_version, dependencies)
+            locations = normalize_locations(locations, ordered=False)
+            output = normalize_locations(output, ordered=False)
+            uses = normalize_locations(uses, ordered=False)
+            if not (locations or output or uses):
+                raise ValueError("One of locations, output or uses is required.")
+            image_format = negotiate_format(
+                image_format,
+                None if stream else request.headers.get("accept"),
+                animated,
+            )
+            if stream and image_format not in STREAMING_FORMATS:
+                raise ValueError(f"Format {image_format} can not be streamed.")
 
-            result = await cached_render_recipes(
-                locations, parsed_dependencies, resolution, row_width, animated
+            generation = await generations.get(str(parsed_dependencies))
+            etag = make_etag(
+                "recipes",
+                parsed_dependencies,
+                generation=generation,
+                locations=locations,
+                output=output,
+                uses=uses,
+                resolution=resolution,
+                row_width=row_width,
+                animated=animated,
+                page=page,
+                format=image_format,
+                # Streamed images are encoded differently than cached ones
+                stream=stream,
+            )
+            if is_not_modified(request, etag):
+                return Response(status_code=304, headers=cache_headers(etag))
+
+            if stream:
+                manager, layout, pages = await asyncio.to_thread(
+                    load_page,
+                    locations,
+                    parsed_dependencies,
+                    generation,
+                    resolution,
+                    row_width,
+                    animated,
+                    page,
+                    outputs=output,
+                    uses=uses,
+                )
+                return StreamingResponse(
+                    stream_recipes(layout, manager, animated),
+                    media_type=media_type(image_format, animated),
+                    headers={**cache_headers(etag), "X-Total-Pages": str(pages)},
+                )
+
+            result, meta = await cached_render_recipes(
+                locations,
+                parsed_dependencies,
+                generation,
+                resolution,
+                row_width,
+                animated,
+                page,
+                image_format,
+                outputs=output,
+                uses=uses,
+            )
+            # Streamed sheets are never cached, there is nothing to prewarm
+            record_render(
+                "recipes",
+                locations=locations,
+                dependencies=parsed_dependencies,
+                resolution=resolution,
+                row_width=row_width,
+                animated=animated,
+                page=page,
+                image_format=image_format,
+                outputs=output,
+                uses=uses,
             )
         except ValueError as e:
             return Response(status_code=422, content=str(e))
 
         return Response(
             content=result,
-            media_type="image/gif" if animated else "image/png",
-            headers={"Cache-Control": "public, max-age=21600, immutable"},
+            media_type=media_type(image_format, animated),
+            headers={**cache_headers(etag), "X-Total-Pages": str(meta["pages"])},
         )
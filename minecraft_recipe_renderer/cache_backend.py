@@ -0,0 +1,316 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Optional, Tuple, Callable, Any
+
+from cachetools import LRUCache, TTLCache
+from fastapi_cache.backends import Backend
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class MemoryTier:
+    """
+    A byte-bounded in-process LRU for the hottest entries.
+    """
+
+    def __init__(self, max_bytes: int, max_item_bytes: int):
+        self.max_item_bytes = max_item_bytes
+        self.entries: LRUCache[str, tuple[float, bytes]] = LRUCache(
+            maxsize=max_bytes, getsizeof=lambda e: len(e[1])
+        )
+
+    def get(self, key: str) -> Optional[tuple[int, bytes]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        ttl = int(expires_at - time.time())
+        if ttl <= 0:
+            del self.entries[key]
+            return None
+        return ttl, value
+
+    def set(self, key: str, value: bytes, expire: int):
+        if len(value) <= self.max_item_bytes:
+            self.entries[key] = (time.time() + expire, value)
+
+    def delete(self, key: str):
+        self.entries.pop(key, None)
+
+    def clear(self, namespace: str):
+        for key in [k for k in self.entries if k.startswith(namespace + ":")]:
+            del self.entries[key]
+
+
+class DiskTier:
+    """
+    Stores large entries as files, each prefixed with its expiry timestamp.
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.size = sum(f.stat().st_size for f in self.path.glob("*.bin"))
+
+    def _file(self, key: str) -> Path:
+        return self.path / (hashlib.sha256(key.encode()).hexdigest() + ".bin")
+
+    def get(self, key: str) -> Optional[tuple[int, bytes]]:
+        file = self._file(key)
+        try:
+            data = file.read_bytes()
+        except FileNotFoundError:
+            return None
+        (expires_at,) = struct.unpack(">d", data[:8])
+        ttl = int(expires_at - time.time())
+        if ttl <= 0:
+            self.delete(key)
+            return None
+        os.utime(file)
+        return ttl, data[8:]
+
+    def set(self, key: str, value: bytes, expire: int):
+        file = self._file(key)
+        if file.exists():
+            self.delete(key)
+        tmp = file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(struct.pack(">d", time.time() + expire) + value)
+        os.replace(tmp, file)
+        self.size += len(value) + 8
+        if self.size > self.max_bytes:
+            self.prune()
+
+    def delete(self, key: str):
+        try:
+            file = self._file(key)
+            size = file.stat().st_size
+            file.unlink()
+            self.size -= size
+        except FileNotFoundError:
+            pass
+
+    def prune(self):
+        # Remove the least recently used files until within budget
+        files = []
+        for f in self.path.glob("*.bin"):
+            try:
+                files.append((f.stat().st_mtime, f.stat().st_size, f))
+            except FileNotFoundError:
+                pass
+        files.sort()
+        self.size = sum(size for _, size, _ in files)
+        for _, size, f in files:
+            if self.size <= self.max_bytes * 0.9:
+                break
+            f.unlink(missing_ok=True)
+            self.size -= size
+
+    def clear(self):
+        for f in self.path.glob("*.bin"):
+            f.unlink(missing_ok=True)
+        self.size = 0
+
+
+class TieredBackend(Backend):
+    """
+    Combines an in-process LRU, a shared backend like Redis and an optional disk tier.
+    Values larger than the disk threshold skip the shared backend and live on disk.
+    Hits in a lower tier are promoted into memory.
+    """
+
+    def __init__(
+        self,
+        backend: Backend,
+        memory: Optional[MemoryTier] = None,
+        disk: Optional[DiskTier] = None,
+        disk_threshold: int = 256 * 1024,
+        default_expire: int = 21600,
+    ):
+        self.backend = backend
+        self.memory = memory
+        self.disk = disk
+        self.disk_threshold = disk_threshold
+        self.default_expire = default_expire
+        self.hits = {"memory": 0, "backend": 0, "disk": 0, "miss": 0}
+
+    def _is_large(self, value: bytes) -> bool:
+        return self.disk is not None and len(value) > self.disk_threshold
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        if self.memory:
+            entry = self.memory.get(key)
+            if entry is not None:
+                self.hits["memory"] += 1
+                return entry
+
+        ttl, value = await self.backend.get_with_ttl(key)
+        ttl = ttl if ttl and ttl > 0 else self.default_expire
+        if value is not None:
+            self.hits["backend"] += 1
+            if self._is_large(value):
+                # Demote large values written before the disk tier existed
+                await asyncio.to_thread(self.disk.set, key, value, ttl)
+                await self.backend.clear(key=key)
+        elif self.disk:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            if entry is not None:
+                self.hits["disk"] += 1
+                ttl, value = entry
+
+        if value is None:
+            self.hits["miss"] += 1
+            return 0, None
+
+        if self.memory:
+            self.memory.set(key, value, ttl)
+        return ttl, value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        expire = expire or self.default_expire
+        if self.memory:
+            self.memory.set(key, value, expire)
+        if self._is_large(value):
+            await asyncio.to_thread(self.disk.set, key, value, expire)
+        else:
+            await self.backend.set(key, value, expire)
+
+    async def clear(
+        self, namespace: Optional[str] = None, key: Optional[str] = None
+    ) -> int:
+        if self.memory:
+            if namespace:
+                self.memory.clear(namespace)
+            elif key:
+                self.memory.delete(key)
+        if self.disk:
+            # File names are hashed, so a namespace clears the whole disk tier
+            if namespace:
+                await asyncio.to_thread(self.disk.clear)
+            elif key:
+                await asyncio.to_thread(self.disk.delete, key)
+        return await self.backend.clear(namespace=namespace, key=key)
+
+    def stats(self) -> dict:
+        return {
+            "hits": dict(self.hits),
+            "memory_bytes": self.memory.entries.currsize if self.memory else 0,
+            "disk_bytes": self.disk.size if self.disk else 0,
+        }
+
+
+class ContentAddressedBackend(Backend):
+    """
+    Stores each distinct value once under its content hash.
+    Request keys only hold a pointer to that digest, so different requests producing
+    byte-identical results share a single stored copy. Their request keys still differ.
+    Values up to the inline threshold are stored in the pointer itself, so a hit on them
+    costs a single round trip.
+    """
+
+    # Pointer types, legacy pointers hold only the hex digest
+    INLINE = b"="
+    DIGEST = b"@"
+
+    def __init__(self, backend: Backend, prefix: str = "cas", inline_bytes: int = 8192):
+        self.backend = backend
+        self.prefix = prefix
+        self.inline_bytes = inline_bytes
+
+    def _blob_key(self, digest: str) -> str:
+        return f"{self.prefix}:{digest}"
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        ttl, pointer = await self.backend.get_with_ttl(key)
+        if pointer is None:
+            return 0, None
+        if pointer.startswith(self.INLINE):
+            return ttl, pointer[len(self.INLINE) :]
+
+        digest = pointer.removeprefix(self.DIGEST).decode()
+        blob_ttl, value = await self.backend.get_with_ttl(self._blob_key(digest))
+        if value is None:
+            return 0, None
+        return min(ttl, blob_ttl), value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        if len(value) <= self.inline_bytes:
+            await self.backend.set(key, self.INLINE + value, expire)
+            return
+
+        digest = hashlib.sha256(value).hexdigest()
+        # Rewriting the blob extends its lifetime to the newest pointer
+        await self.backend.set(self._blob_key(digest), value, expire)
+        await self.backend.set(key, self.DIGEST + digest.encode(), expire)
+
+    async def clear(
+        self, namespace: Optional[str] = None, key: Optional[str] = None
+    ) -> int:
+        # Orphaned blobs expire on their own
+        return await self.backend.clear(namespace=namespace, key=key)
+
+    def stats(self) -> dict:
+        return self.backend.stats() if hasattr(self.backend, "stats") else {}
+
+
+def canonical_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> str:
+    """
+    Builds keys from the bound arguments, independent of how they were passed.
+    """
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    key = json.dumps(
+        [func.__module__, func.__name__, bound.arguments], sort_keys=True, default=str
+    )
+    return f"{namespace}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def negative_cache(ttl: int, maxsize: int = 4096):
+    """
+    Remember ValueErrors of an async function for a short time and raise them again
+    for identical arguments without calling the function.
+    """
+    failures: TTLCache[str, str] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def wrapper(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def inner(*args, **kwargs):
+            bound = signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            key = json.dumps(bound.arguments, sort_keys=True, default=str)
+
+            if key in failures:
+                raise ValueError(failures[key])
+
+            try:
+                return await func(*args, **kwargs)
+            except ValueError as e:
+                failures[key] = str(e)
+                raise
+
+        return inner
+
+    return wrapper
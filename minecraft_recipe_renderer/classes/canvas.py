@@ -1,3 +1,4 @@
+import threading
 from functools import cache
 from pathlib import Path
 from typing import Optional, TYPE_CHECKING
@@ -6,12 +7,16 @@ import requests
 from PIL import Image, ImageDraw, ImageFont
 
 from .item import Item
+from .model import Model
 
 if TYPE_CHECKING:
     from ..item_renderer import ItemRenderer
 
 root = Path(__file__)
 
+# FreeType faces must not be used by multiple threads at once
+font_lock = threading.Lock()
+
 
 @cache
 def get_font(
@@ -35,7 +40,10 @@ def get_font(
 
 @cache
 def load_texture(name: str):
-    return Image.open(root.parent.parent / "assets" / (name + ".png"))
+    # Load eagerly, lazy loading is not safe once the image is shared between threads
+    image = Image.open(root.parent.parent / "assets" / (name + ".png"))
+    image.load()
+    return image
 
 
 class Canvas:
@@ -59,32 +67,47 @@ class Canvas:
         x: int,
         y: int,
         margin: int = 1,
+    ):
+        model = item_renderer.resource_manager.get_model(item.id) if item else None
+        self.model_slot(item_renderer, model, x, y, margin)
+
+    def model_slot(
+        self,
+        item_renderer: "ItemRenderer",
+        model: Optional[Model],
+        x: int,
+        y: int,
+        margin: int = 1,
     ):
         self.box("slot", x, y, 16 + margin * 2, 16 + margin * 2)
-        if item:
-            self.item(item_renderer, item, x + margin, y + margin)
+        if model:
+            self.model(item_renderer, model, x + margin, y + margin)
 
     def item(self, item_renderer: "ItemRenderer", item: Item, x: int, y: int):
         model = item_renderer.resource_manager.get_model(item.id)
         if model:
-            texture = item_renderer.render(model, 16 * self.resolution)
-            self.draw(
-                self.image,
-                texture,
-                (0, 0, texture.width, texture.height),
-                (x, y),
-                None,
-                False,
-            )
+            self.model(item_renderer, model, x, y)
 
-    def text(self, text: str, x: int, y: int):
-        self.image_draw.text(
-            (x * self.resolution, y * self.resolution),
-            text,
-            font=get_font(size=self.resolution * 10),
-            fill=self.text_color,
+    def model(self, item_renderer: "ItemRenderer", model: Model, x: int, y: int):
+        texture = item_renderer.render(model, 16 * self.resolution)
+        self.draw(
+            self.image,
+            texture,
+            (0, 0, texture.width, texture.height),
+            (x, y),
+            None,
+            False,
         )
 
+    def text(self, text: str, x: int, y: int):
+        with font_lock:
+            self.image_draw.text(
+                (x * self.resolution, y * self.resolution),
+                text,
+                font=get_font(size=self.resolution * 10),
+                fill=self.text_color,
+            )
+
     def box(self, texture: str, x: int, y: int, width: int, height: int):
         tex = load_texture(texture)
         self.draw(self.image, tex, (0, 0, 8, 8), (x, y))
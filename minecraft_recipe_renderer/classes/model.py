@@ -1,53 +1,119 @@
+import sys
+
+import numpy as np
+
 from ..utils import to_location
 
+# Columns of a model's geometry array, one row per element
+FROM = slice(0, 3)
+TO = slice(3, 6)
+ORIGIN = slice(6, 9)
+ANGLE = 9
 
-class Display:
-    def __init__(self, display: dict):
-        self.rotation = display.get("rotation", [30, 225, 0])
-        self.translation = display.get("translation", [0, 0, 0])
-        self.scale = display.get("scale", [0.625, 0.625, 0.625])
+
+def intern_location(location: str) -> str:
+    return sys.intern(to_location(location))
 
 
-class Rotation:
-    def __init__(self, rotation: dict):
-        self.origin = rotation.get("origin", [8, 8, 8])
-        self.axis = rotation.get("axis", "y")
-        self.angle = rotation.get("angle", 0)
+class Display:
+    __slots__ = ("rotation", "translation", "scale")
+
+    def __init__(self, display: dict):
+        self.rotation = tuple(display.get("rotation", (30, 225, 0)))
+        self.translation = tuple(display.get("translation", (0, 0, 0)))
+        self.scale = tuple(display.get("scale", (0.625, 0.625, 0.625)))
 
 
 class Face:
+    __slots__ = ("uv", "texture", "rotation")
+
     def __init__(self, face: dict):
-        self.uv = face.get("uv", [0, 0, 16, 16])
-        self.texture = to_location(face.get("texture", ""))
+        self.uv = tuple(face.get("uv", (0, 0, 16, 16)))
+        self.texture = intern_location(face.get("texture", ""))
         self.rotation = face.get("rotation", 0)
 
 
 class Element:
-    def __init__(self, element: dict):
-        self.from_pos = element.get("from", [0, 0, 0])
-        self.to_pos = element.get("to", [16, 16, 16])
-        self.rotation = Rotation(element.get("rotation", {}))
-        self.faces = {k: Face(v) for k, v in element.get("faces", {}).items()}
+    """
+    A cuboid of a model, its coordinates are a row of the model's geometry array.
+    """
+
+    __slots__ = ("geometry", "index", "axis", "faces")
+
+    def __init__(
+        self, geometry: np.ndarray, index: int, axis: str, faces: dict[str, Face]
+    ):
+        self.geometry = geometry
+        self.index = index
+        self.axis = axis
+        self.faces = faces
+
+    @property
+    def from_pos(self) -> np.ndarray:
+        return self.geometry[self.index, FROM]
+
+    @property
+    def to_pos(self) -> np.ndarray:
+        return self.geometry[self.index, TO]
+
+    @property
+    def origin(self) -> np.ndarray:
+        return self.geometry[self.index, ORIGIN]
+
+    @property
+    def angle(self) -> float:
+        return self.geometry[self.index, ANGLE]
+
+
+def load_elements(elements: list[dict]) -> tuple[np.ndarray, tuple[Element, ...]]:
+    """
+    Pack the coordinates of all elements into one array and create the elements referencing it.
+    """
+    geometry = np.empty((len(elements), 10), dtype=float)
+    loaded = []
+    for i, element in enumerate(elements):
+        rotation = element.get("rotation", {})
+        geometry[i, FROM] = element.get("from", (0, 0, 0))
+        geometry[i, TO] = element.get("to", (16, 16, 16))
+        geometry[i, ORIGIN] = rotation.get("origin", (8, 8, 8))
+        geometry[i, ANGLE] = rotation.get("angle", 0)
+        faces = {sys.intern(k): Face(v) for k, v in element.get("faces", {}).items()}
+        loaded.append(
+            Element(geometry, i, sys.intern(rotation.get("axis", "y")), faces)
+        )
+    return geometry, tuple(loaded)
 
 
 DEFAULT_DISPLAY = Display({})
 
 
 class Model:
+    __slots__ = (
+        "resolved",
+        "location",
+        "parent",
+        "display",
+        "textures",
+        "gui_light",
+        "geometry",
+        "elements",
+    )
+
     def __init__(self, location: str, model: dict):
         self.resolved = False
-        self.location = location
-        self.parent = to_location(model["parent"]) if "parent" in model else None
+        self.location = sys.intern(location)
+        self.parent = intern_location(model["parent"]) if "parent" in model else None
         self.display = (
             Display(model.get("display", {})["gui"])
             if "gui" in model.get("display", {})
             else DEFAULT_DISPLAY
         )
         self.textures = {
-            k: to_location(v) for k, v in model.get("textures", {}).items()
+            sys.intern(k): intern_location(v)
+            for k, v in model.get("textures", {}).items()
         }
-        self.gui_light = model.get("gui_light", "")
-        self.elements = [Element(e) for e in model.get("elements", [])]
+        self.gui_light = sys.intern(model.get("gui_light", ""))
+        self.geometry, self.elements = load_elements(model.get("elements", []))
 
     def apply_parent(self, parent: "Model"):
         self.resolved = True
@@ -55,6 +121,8 @@ class Model:
             if k not in self.textures:
                 self.textures[k] = v
         if not self.elements:
+            # Inherited geometry is shared, not copied
+            self.geometry = parent.geometry
             self.elements = parent.elements
         if self.display == DEFAULT_DISPLAY:
             self.display = parent.display
@@ -0,0 +1,78 @@
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    return value.lower() in ("1", "true", "yes") if value else default
+
+
+def env_list(name: str, default: str) -> list[str]:
+    return [v.strip() for v in os.getenv(name, default).split(";") if v.strip()]
+
+
+# Memory budget for loaded resource managers, measured in bytes
+MANAGER_CACHE_BYTES = env_int("MCR_MANAGER_CACHE_BYTES", 4 * 1024**3)
+MANAGER_CACHE_TTL = env_int("MCR_MANAGER_CACHE_TTL", 21600)
+
+# Minecraft versions whose managers are never evicted
+PINNED_VERSIONS = env_list("MCR_PINNED_VERSIONS", "1.20.1")
+
+# Minecraft versions whose managers are loaded when a worker starts
+PRELOAD_VERSIONS = env_list("MCR_PRELOAD_VERSIONS", "")
+
+# Recently requested renders recorded in Redis and rendered when a worker starts, 0 disables it
+HOT_LIST_SIZE = env_int("MCR_HOT_LIST_SIZE", 0)
+# Seconds recorded renders are buffered, so each worker writes them in one batch
+HOT_LIST_INTERVAL = env_int("MCR_HOT_LIST_INTERVAL", 10)
+
+# Whether a worker only accepts traffic after preloading, instead of preloading in the background
+PREWARM_BLOCKING = env_bool("MCR_PREWARM_BLOCKING", False)
+
+# Seconds a worker may use a dependency set's reload generation before reading it from Redis again
+GENERATION_TTL = env_int("MCR_GENERATION_TTL", 5)
+
+# Back off from reloading dependency sets that failed to load
+MANAGER_RETRY_DELAY = env_int("MCR_MANAGER_RETRY_DELAY", 30)
+MANAGER_MAX_RETRY_DELAY = env_int("MCR_MANAGER_MAX_RETRY_DELAY", 3600)
+
+# Disk budget for downloaded and extracted dependencies, entries used within the manager TTL are kept
+DEPENDENCY_CACHE_BYTES = env_int("MCR_DEPENDENCY_CACHE_BYTES", 16 * 1024**3)
+
+# Dependencies of a manager downloaded at the same time
+DOWNLOAD_THREADS = env_int("MCR_DOWNLOAD_THREADS", 4)
+
+# Result cache tiers in front of and next to Redis
+CACHE_MEMORY_BYTES = env_int("MCR_CACHE_MEMORY_BYTES", 64 * 1024**2)
+CACHE_MEMORY_ITEM_BYTES = env_int("MCR_CACHE_MEMORY_ITEM_BYTES", 1024**2)
+CACHE_DISK_PATH = os.getenv("MCR_CACHE_DISK_PATH", "")
+CACHE_DISK_BYTES = env_int("MCR_CACHE_DISK_BYTES", 4 * 1024**3)
+CACHE_DISK_THRESHOLD = env_int("MCR_CACHE_DISK_THRESHOLD", 256 * 1024)
+
+# Results up to this size are stored with their request key instead of deduplicated by content
+CACHE_INLINE_BYTES = env_int("MCR_CACHE_INLINE_BYTES", 8192)
+
+# How long unknown models and unmatched recipes are remembered
+NEGATIVE_CACHE_TTL = env_int("MCR_NEGATIVE_CACHE_TTL", 300)
+
+# Image encoder settings for cached renders, either "fast" or "compact"
+ENCODING_PROFILE = os.getenv("MCR_ENCODING_PROFILE", "compact")
+
+# Image encoder settings for streamed sheets, which are sent once and never cached
+STREAM_ENCODING_PROFILE = os.getenv("MCR_STREAM_ENCODING_PROFILE", "fast")
+
+# Threads rendering recipes, shared by all requests
+RENDER_THREADS = env_int("MCR_RENDER_THREADS", os.cpu_count() or 1)
+
+# Recipes a single request may have in flight, so one large sheet cannot starve others
+RENDER_WINDOW = env_int("MCR_RENDER_WINDOW", max(1, RENDER_THREADS // 2))
+
+# Pack item and block textures into a memory mapped atlas stored next to each dependency
+TEXTURE_ATLAS = env_bool("MCR_TEXTURE_ATLAS", False)
+
+# Decoded and scaled textures shared by all managers, keyed by content hash
+TEXTURE_CACHE_BYTES = env_int("MCR_TEXTURE_CACHE_BYTES", 256 * 1024**2)
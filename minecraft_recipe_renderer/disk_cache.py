@@ -0,0 +1,200 @@
+import fcntl
+import hashlib
+import os
+import shutil
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterable
+
+# Directories inside the cache root which are not entries
+RESERVED = {"objects", "locks"}
+
+# Last use is written at most this often per entry
+TOUCH_INTERVAL = 60
+
+
+class DiskCache:
+    """
+    Manages extracted dependencies below a root directory, one entry directory per key.
+    Files extracted from archives are hard links into a content-addressed object store,
+    so identical files across entries are stored once.
+    When the byte budget is exceeded, the least recently used entries are evicted, but only
+    once unused for at least min_age, as loaded managers still read files lazily.
+    Creation and eviction are guarded by file locks, so multiple workers can share the root.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 0,
+        min_age: float = 21600,
+        in_use: Callable[[], Iterable[str]] = tuple,
+    ):
+        """
+        :param max_bytes: The byte budget, 0 disables eviction.
+        :param in_use: Returns the entries used by this process, which are never evicted.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.min_age = min_age
+        self.in_use = in_use
+        self.objects = root / "objects"
+        self.locks = root / "locks"
+        self.touched: dict[str, float] = {}
+        self.thread_lock = threading.Lock()
+
+    def entry(self, key: str) -> Path:
+        return self.root / key
+
+    @contextmanager
+    def _flock(self, name: str, mode: int):
+        self.locks.mkdir(parents=True, exist_ok=True)
+        with (self.locks / (name + ".lock")).open("a") as f:
+            fcntl.flock(f, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextmanager
+    def lock(self, key: str):
+        """
+        Hold while creating or updating an entry. Eviction waits for all holders.
+        """
+        with self._flock("evict", fcntl.LOCK_SH), self._flock(key, fcntl.LOCK_EX):
+            yield
+
+    @contextmanager
+    def staging(self, key: str):
+        """
+        Create an entry atomically, the yielded directory is moved into place on success.
+        Must be used while holding the entry lock.
+        """
+        tmp = self.root / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        try:
+            yield tmp
+            os.replace(tmp, self.entry(key))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def touch(self, key: str):
+        """
+        Record that an entry is in use.
+        """
+        now = time.time()
+        with self.thread_lock:
+            if now - self.touched.get(key, 0) < TOUCH_INTERVAL:
+                return
+            self.touched[key] = now
+        (self.root / (key + ".used")).touch()
+
+    def last_used(self, key: str) -> float:
+        for path in (self.root / (key + ".used"), self.entry(key)):
+            try:
+                return path.stat().st_mtime
+            except FileNotFoundError:
+                pass
+        return 0
+
+    def _link_object(self, data: bytes, target: Path):
+        digest = hashlib.sha256(data).hexdigest()
+        obj = self.objects / digest[:2] / digest[2:]
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp = obj.with_name(f"{obj.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, obj)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(obj, target)
+        except OSError:
+            # File systems without hard links get a private copy
+            shutil.copyfile(obj, target)
+
+    def extract_zip(self, archive: Path, target: Path):
+        """
+        Extract an archive with every file linked to its content-addressed object.
+        """
+        with zipfile.ZipFile(archive, "r") as ref:
+            for info in ref.infolist():
+                name = PurePosixPath(info.filename)
+                if info.is_dir() or name.is_absolute() or ".." in name.parts:
+                    continue
+                self._link_object(ref.read(info), target.joinpath(*name.parts))
+
+    def entries(self) -> list[str]:
+        return [
+            p.name
+            for p in self.root.iterdir()
+            if p.is_dir() and p.name not in RESERVED and not p.name.endswith(".tmp")
+        ]
+
+    @staticmethod
+    def _files(path: Path):
+        for root, _, files in os.walk(path):
+            for file in files:
+                try:
+                    yield os.lstat(os.path.join(root, file))
+                except FileNotFoundError:
+                    pass
+
+    def size(self) -> int:
+        # Hard links are only counted once
+        inodes = {}
+        for stat in self._files(self.root):
+            inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+        return sum(inodes.values())
+
+    def _freed_by(self, key: str) -> int:
+        # Files only linked from this entry, or from it and the object store
+        return sum(
+            stat.st_size for stat in self._files(self.entry(key)) if stat.st_nlink <= 2
+        )
+
+    def remove(self, key: str):
+        shutil.rmtree(self.entry(key), ignore_errors=True)
+        for sidecar in self.root.glob(key + ".*"):
+            if sidecar.is_file():
+                sidecar.unlink(missing_ok=True)
+        with self.thread_lock:
+            self.touched.pop(key, None)
+
+    def collect_objects(self):
+        # Objects no entry links to anymore
+        for stat_path in self.objects.glob("*/*"):
+            try:
+                if stat_path.stat().st_nlink == 1:
+                    stat_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def evict(self, keep: Iterable[str] = ()):
+        """
+        Evict the least recently used entries until the cache fits its budget.
+        :param keep: Entries which must not be evicted, like the one just created.
+        """
+        if not self.max_bytes:
+            return
+        keep = set(keep).union(self.in_use())
+
+        with self._flock("evict", fcntl.LOCK_EX):
+            total = self.size()
+            if total <= self.max_bytes:
+                return
+
+            now = time.time()
+            for key in sorted(self.entries(), key=self.last_used):
+                if total <= self.max_bytes:
+                    break
+                if key in keep or now - self.last_used(key) < self.min_age:
+                    continue
+                print(f"Evicting cached dependency {key}")
+                total -= self._freed_by(key)
+                self.remove(key)
+
+            self.collect_objects()
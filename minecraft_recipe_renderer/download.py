@@ -0,0 +1,89 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+# Seconds to wait for a connection or the next chunk
+DOWNLOAD_TIMEOUT = 60
+
+DOWNLOAD_ATTEMPTS = 3
+
+# Mojang's object URLs contain the SHA-1 of the file
+MOJANG_OBJECT_PATTERN = re.compile(r"/objects/([0-9a-f]{40})/")
+
+
+def expected_sha1(url: str) -> Optional[str]:
+    match = MOJANG_OBJECT_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def file_sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        while chunk := f.read(DOWNLOAD_CHUNK_BYTES):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _fetch(url: str, part: Path):
+    """
+    Append the remainder of the file to the partial download.
+    """
+    offset = part.stat().st_size if part.exists() else 0
+    headers = {"User-Agent": USER_AGENT}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+
+    with requests.get(
+        url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+    ) as response:
+        if response.status_code == 416:
+            # The partial file is not a prefix of the remote file anymore
+            part.unlink()
+            raise IOError(f"Range not satisfiable for {url}")
+        response.raise_for_status()
+
+        if response.status_code != 206:
+            # The server ignored the range and sends the whole file
+            offset = 0
+        length = response.headers.get("Content-Length")
+
+        with part.open("ab" if offset else "wb") as f:
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+
+    if length is not None and part.stat().st_size != offset + int(length):
+        raise IOError(f"Incomplete download of {url}")
+
+
+def download(url: str, target: Path, sha1: Optional[str] = None):
+    """
+    Stream a file to disk in chunks, resuming an interrupted download from its .part file.
+    :param sha1: The expected SHA-1 of the file, a mismatch discards the download.
+    """
+    target.parent.mkdir(parents=True, exist_ok=True)
+    part = target.with_name(target.name + ".part")
+
+    for attempt in range(DOWNLOAD_ATTEMPTS):
+        try:
+            _fetch(url, part)
+            break
+        except requests.HTTPError:
+            raise
+        except (IOError, requests.ConnectionError, requests.Timeout) as e:
+            if attempt + 1 == DOWNLOAD_ATTEMPTS:
+                raise
+            print(f"Retrying download of {url}: {e}")
+
+    if sha1 is not None and file_sha1(part) != sha1:
+        part.unlink()
+        raise ValueError(f"Checksum mismatch for {url}")
+
+    os.replace(part, target)
@@ -0,0 +1,349 @@
+import io
+import struct
+import zlib
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+from PIL import GifImagePlugin, Image
+
+STATIC_FORMATS = {
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+ANIMATION_FORMATS = {
+    "gif": "image/gif",
+    "apng": "image/apng",
+    "webp": "image/webp",
+}
+
+# Formats which can be encoded incrementally while the image is composed
+STREAMING_FORMATS = {"png", "gif"}
+
+# Encoder settings, "fast" favours latency for streamed output, "compact" favours size for cached output
+PROFILES = {
+    "fast": {"png": {"compress_level": 1}, "webp": {"method": 0}},
+    "compact": {"png": {"optimize": True}, "webp": {"method": 6}},
+}
+
+# Palette index reserved for transparent pixels
+TRANSPARENT_INDEX = 255
+
+# Compressed bytes collected before a streamed PNG emits an IDAT chunk
+PNG_CHUNK_BYTES = 64 * 1024
+
+
+def _packed_rgba(frames: list[Image.Image]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    :return: The pixels of all frames packed as little endian RGBA, and which are opaque.
+    """
+    rgba = np.stack([np.asarray(f.convert("RGBA")) for f in frames])
+    return rgba.view("<u4")[..., 0], rgba[..., 3] >= 128
+
+
+def _unpack_rgb(packed: np.ndarray) -> np.ndarray:
+    return np.stack(
+        [packed & 0xFF, (packed >> 8) & 0xFF, (packed >> 16) & 0xFF], axis=-1
+    ).astype(np.uint8)
+
+
+def _palette(colors: np.ndarray) -> tuple[np.ndarray, np.ndarray, bytes]:
+    """
+    Build a palette of at most 255 entries for the given packed opaque colors.
+    The palette is exact as long as there are at most 255 distinct colors, which holds for
+    almost every recipe sheet since they are made of GUI and item textures. Otherwise the
+    low bits of each channel are dropped until the colors fit, and each entry is the
+    average of the colors it replaces.
+    :return: The sorted distinct colors, their palette indices and the palette.
+    """
+    colors, counts = np.unique(colors, return_counts=True)
+    rgb = _unpack_rgb(colors)
+    entries, lookup = rgb, np.arange(len(colors), dtype=np.uint8)
+    bits = 0
+    while len(entries) > TRANSPARENT_INDEX:
+        bits += 1
+        channel = (0xFF << bits) & 0xFF
+        reduced = colors & (channel | channel << 8 | channel << 16)
+        keys, lookup = np.unique(reduced, return_inverse=True)
+        weights = np.bincount(lookup, counts, len(keys))
+        entries = np.stack(
+            [np.bincount(lookup, rgb[:, c] * counts, len(keys)) for c in range(3)],
+            axis=-1,
+        )
+        entries = np.rint(entries / weights[:, None]).astype(np.uint8)
+        lookup = lookup.astype(np.uint8)
+
+    palette = np.zeros((256, 3), dtype=np.uint8)
+    palette[: len(entries)] = entries
+    return colors, lookup, palette.tobytes()
+
+
+def _indices(
+    mask: np.ndarray, values: np.ndarray, colors: np.ndarray, lookup: np.ndarray
+) -> np.ndarray:
+    """
+    :return: Palette indices of the pixels under the mask, transparent elsewhere.
+    """
+    indices = np.full(mask.shape, TRANSPARENT_INDEX, dtype=np.uint8)
+    indices[mask] = lookup[np.searchsorted(colors, values)]
+    return indices
+
+
+def quantize_frames(frames: list[Image.Image]) -> list[Image.Image]:
+    """
+    Convert RGBA frames to palette frames sharing one global palette.
+    """
+    pixels, opaque = _packed_rgba(frames)
+    values = pixels[opaque] & 0xFFFFFF
+    colors, lookup, palette = _palette(values)
+
+    result = []
+    for p, o in zip(pixels, opaque):
+        indices = _indices(o, p[o] & 0xFFFFFF, colors, lookup)
+        frame = Image.fromarray(indices, "P")
+        frame.putpalette(palette)
+        frame.info["transparency"] = TRANSPARENT_INDEX
+        result.append(frame)
+    return result
+
+
+def palettize(image: Image.Image) -> Optional[Image.Image]:
+    """
+    Convert an RGBA image to a palette image with per-entry alpha, if that is lossless.
+    :return: The palette image or None if the image has more than 256 colors.
+    """
+    rgba = np.asarray(image.convert("RGBA"))
+    packed = rgba.view("<u4")[..., 0].copy()
+    # The color of fully transparent pixels is irrelevant
+    packed[rgba[..., 3] == 0] = 0
+    colors, indices = np.unique(packed, return_inverse=True)
+    if len(colors) > 256:
+        return None
+
+    palette = Image.fromarray(indices.reshape(rgba.shape[:2]).astype(np.uint8), "P")
+    palette.putpalette(_unpack_rgb(colors).tobytes())
+    palette.info["transparency"] = bytes((colors >> 24).astype(np.uint8))
+    return palette
+
+
+def encode_image(
+    texture: Image.Image, image_format: str = "png", profile: str = "compact"
+) -> bytes:
+    settings = PROFILES[profile]
+    buffer = io.BytesIO()
+    if image_format == "png":
+        # Sheets rarely use more than 256 colors, only the others are encoded as RGBA
+        palette = palettize(texture) if profile == "compact" else None
+        (texture if palette is None else palette).save(
+            buffer, format="PNG", **settings["png"]
+        )
+    elif image_format == "webp":
+        texture.save(buffer, format="WEBP", lossless=True, **settings["webp"])
+    else:
+        raise ValueError(f"Unknown image format: {image_format}")
+    return buffer.getvalue()
+
+
+def _changed_box(changed: np.ndarray) -> Optional[tuple[slice, slice]]:
+    rows = np.flatnonzero(changed.any(axis=1))
+    if len(rows) == 0:
+        return None
+    columns = np.flatnonzero(changed[rows[0] : rows[-1] + 1].any(axis=0))
+    return slice(rows[0], rows[-1] + 1), slice(columns[0], columns[-1] + 1)
+
+
+def encode_gif(frames: list[Image.Image], duration: int) -> bytes:
+    """
+    Encode frames with one global palette. Unless a pixel turns transparent, including when
+    looping back to the first frame, each frame after the first only stores the bounding
+    box of the pixels which changed and is drawn on top of the previous one.
+    """
+    pixels, opaque = _packed_rgba(frames)
+    height, width = pixels.shape[1:]
+    clearing = bool(np.any(opaque & ~np.roll(opaque, -1, axis=0)))
+
+    # The region of each frame, and the pixels drawn in it
+    regions = []
+    for i in range(len(frames)):
+        box = (slice(0, height), slice(0, width))
+        if i > 0 and not clearing:
+            box = _changed_box(pixels[i] != pixels[i - 1]) or (slice(0, 1), slice(0, 1))
+            mask = opaque[i][box] & (pixels[i][box] != pixels[i - 1][box])
+        else:
+            mask = opaque[i]
+        regions.append((box, mask, pixels[i][box][mask] & 0xFFFFFF))
+
+    colors, lookup, palette = _palette(np.concatenate([r[2] for r in regions]))
+
+    buffer = io.BytesIO()
+    # Logical screen with the global color table, looping forever
+    buffer.write(
+        b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF7, TRANSPARENT_INDEX, 0)
+    )
+    buffer.write(palette)
+    buffer.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", 0) + b"\x00")
+    for box, mask, values in regions:
+        frame = Image.fromarray(_indices(mask, values, colors, lookup), "P")
+        buffer.write(
+            b"".join(
+                GifImagePlugin.getdata(
+                    frame,
+                    offset=(box[1].start, box[0].start),
+                    duration=duration,
+                    disposal=2 if clearing else 1,
+                    transparency=TRANSPARENT_INDEX,
+                )
+            )
+        )
+    buffer.write(b";")
+    return buffer.getvalue()
+
+
+def encode_apng(
+    frames: list[Image.Image], duration: int, profile: str = "compact"
+) -> bytes:
+    buffer = io.BytesIO()
+    frames[0].save(
+        buffer,
+        format="PNG",
+        save_all=True,
+        append_images=frames[1:],
+        duration=duration,
+        loop=0,
+        disposal=0,
+        blend=0,
+        **PROFILES[profile]["png"],
+    )
+    return buffer.getvalue()
+
+
+def encode_webp(
+    frames: list[Image.Image], duration: int, profile: str = "compact"
+) -> bytes:
+    buffer = io.BytesIO()
+    frames[0].save(
+        buffer,
+        format="WEBP",
+        save_all=True,
+        append_images=frames[1:],
+        duration=duration,
+        loop=0,
+        lossless=True,
+        **PROFILES[profile]["webp"],
+    )
+    return buffer.getvalue()
+
+
+def encode_animation(
+    frames: list[Image.Image],
+    animation_format: str = "gif",
+    duration: int = 1000,
+    profile: str = "compact",
+) -> bytes:
+    if animation_format == "gif":
+        return encode_gif(frames, duration)
+    elif animation_format == "apng":
+        return encode_apng(frames, duration, profile)
+    elif animation_format == "webp":
+        return encode_webp(frames, duration, profile)
+    else:
+        raise ValueError(f"Unknown animation format: {animation_format}")
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return (
+        struct.pack(">I", len(data))
+        + chunk_type
+        + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data))
+    )
+
+
+def stream_png(
+    width: int,
+    height: int,
+    bands: Iterable[Image.Image],
+    profile: str = "compact",
+) -> Iterator[bytes]:
+    """
+    Encode an RGBA image given as full width bands from top to bottom.
+    Scanlines are compressed as the bands arrive, so only one band is held in memory.
+    """
+    yield b"\x89PNG\r\n\x1a\n"
+    yield _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    compressor = zlib.compressobj(1 if profile == "fast" else 9)
+    pending = bytearray()
+    previous = np.zeros(width * 4, dtype=np.uint8)
+    rows = 0
+    for band in bands:
+        if band.width != width:
+            raise ValueError(f"Band width {band.width} does not match {width}")
+        pixels = np.asarray(band.convert("RGBA")).reshape(band.height, width * 4)
+
+        # The "up" filter stores the difference to the scanline above
+        filtered = np.empty((band.height, width * 4 + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        filtered[:1, 1:] = pixels[:1] - previous
+        filtered[1:, 1:] = pixels[1:] - pixels[:-1]
+        previous = pixels[-1].copy()
+        rows += band.height
+
+        pending += compressor.compress(filtered.tobytes())
+        if len(pending) >= PNG_CHUNK_BYTES:
+            yield _png_chunk(b"IDAT", bytes(pending))
+            pending.clear()
+
+    if rows != height:
+        raise ValueError(f"Expected {height} rows, got {rows}")
+    pending += compressor.flush()
+    yield _png_chunk(b"IDAT", bytes(pending))
+    yield _png_chunk(b"IEND", b"")
+
+
+def stream_gif(
+    width: int, height: int, frames: Iterable[Image.Image], duration: int = 1000
+) -> Iterator[bytes]:
+    """
+    Encode frames as they are produced, each with its own local palette.
+    Unlike encode_gif, no frame has to be kept once it is written.
+    """
+    # Logical screen without a global color table, looping forever
+    yield b"GIF89a" + struct.pack("<HHBBB", width, height, 0, 0, 0)
+    yield b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", 0) + b"\x00"
+
+    for frame in frames:
+        (quantized,) = quantize_frames([frame])
+        # Frames cover the whole canvas, so clearing between them is always correct
+        yield b"".join(
+            GifImagePlugin.getdata(
+                quantized,
+                duration=duration,
+                disposal=2,
+                transparency=TRANSPARENT_INDEX,
+                include_color_table=True,
+            )
+        )
+
+    yield b";"
+
+
+def negotiate_format(requested: str, accept: Optional[str], animated: bool) -> str:
+    """
+    Pick the output format from an explicit request or the Accept header.
+    """
+    formats = ANIMATION_FORMATS if animated else STATIC_FORMATS
+    if requested:
+        if requested not in formats:
+            raise ValueError(f"Unknown image format: {requested}")
+        return requested
+    accept = accept or ""
+    if "image/webp" in accept:
+        return "webp"
+    if animated and "image/apng" in accept:
+        return "apng"
+    return "gif" if animated else "png"
+
+
+def media_type(image_format: str, animated: bool) -> str:
+    return (ANIMATION_FORMATS if animated else STATIC_FORMATS)[image_format]
@@ -0,0 +1,91 @@
+import hashlib
+from typing import Iterable, Optional
+
+from cachetools import TTLCache
+from redis.asyncio.client import Redis
+from redis.exceptions import RedisError
+
+# Starts a new generation and moves the given fields to it, atomically
+BUMP_SCRIPT = """
+local generation = redis.call('HINCRBY', KEYS[1], 'generation', 1)
+for _, field in ipairs(ARGV) do
+    redis.call('HSET', KEYS[1], field, generation)
+end
+return generation
+"""
+
+
+class Generations:
+    """
+    Counts the reloads of each dependency set in a Redis hash shared by all workers.
+    Cache keys and ETags are derived from these counters, so they agree between workers
+    and need no loaded manager. An item only moves to a new generation when a reload
+    changed its resources, so renders of other items stay cached.
+    Counters are kept in memory for a few seconds, sparing most requests a round trip.
+    Without Redis, the counters are local to the process.
+    """
+
+    def __init__(self, prefix: str, ttl: float, redis: Optional[Redis] = None):
+        self.prefix = prefix
+        self.redis = redis
+        self.cache: TTLCache[str, dict[str, int]] = TTLCache(maxsize=1024, ttl=ttl)
+        self.local: dict[str, dict[str, int]] = {}
+
+    def _key(self, dependencies: str) -> str:
+        return f"{self.prefix}:{hashlib.sha256(dependencies.encode()).hexdigest()}"
+
+    async def _fields(self, dependencies: str) -> dict[str, int]:
+        fields = self.cache.get(dependencies)
+        if fields is not None:
+            return fields
+
+        fields = self.local.get(dependencies, {})
+        if self.redis is not None:
+            try:
+                raw = await self.redis.hgetall(self._key(dependencies))
+                fields = {k.decode(): int(v) for k, v in raw.items()}
+            except RedisError as e:
+                print(f"Failed to read generations: {e}")
+        self.cache[dependencies] = fields
+        return fields
+
+    async def get(self, dependencies: str, location: Optional[str] = None) -> int:
+        """
+        :param dependencies: The dependency set, as keyed in the manager cache.
+        :param location: A single item, whose generation is the reload that last changed it.
+        :return: The generation of the dependency set, or of the item.
+        """
+        fields = await self._fields(dependencies)
+        if location is None or ";" in location or location.startswith("#"):
+            return fields.get("generation", 0)
+        return max(fields.get("all", 0), fields.get("item:" + location, 0))
+
+    async def bump(
+        self, dependencies: str, items: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Start a new generation after a reload.
+        :param items: The items whose resources changed, None if any of them may have.
+        :return: The new generation.
+        """
+        fields = ["all"] if items is None else ["item:" + item for item in items]
+
+        generation = None
+        if self.redis is not None:
+            try:
+                generation = int(
+                    await self.redis.eval(
+                        BUMP_SCRIPT, 1, self._key(dependencies), *fields
+                    )
+                )
+                self.cache.pop(dependencies, None)
+            except RedisError as e:
+                print(f"Failed to bump generation: {e}")
+
+        if generation is None:
+            local = self.local.setdefault(dependencies, {})
+            generation = local.get("generation", 0) + 1
+            local["generation"] = generation
+            local.update((field, generation) for field in fields)
+            self.cache[dependencies] = local
+        return generation
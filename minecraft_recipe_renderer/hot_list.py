@@ -0,0 +1,71 @@
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+from redis.asyncio.client import Redis
+from redis.exceptions import RedisError
+
+
+class HotList:
+    """
+    Records requested renders in a Redis sorted set shared by all workers, scored by
+    the time of their last request. Only the most recent entries are kept, so a fresh
+    worker can render what is currently in demand before it is asked for.
+    Records are buffered and written together at most once per interval.
+    """
+
+    def __init__(self, redis: Redis, key: str, size: int, interval: float = 10):
+        self.redis = redis
+        self.key = key
+        self.size = size
+        self.interval = interval
+        # Buffered members by the time of their last request, oldest first
+        self.pending: dict[str, float] = {}
+        self.flushing: Optional[asyncio.Task] = None
+
+    def record(self, endpoint: str, params: dict[str, Any]):
+        """
+        Buffer a render, a flush is scheduled unless one already is.
+        """
+        member = json.dumps([endpoint, params], sort_keys=True)
+        self.pending.pop(member, None)
+        self.pending[member] = time.time()
+        # Older records would be trimmed from the sorted set anyway
+        while len(self.pending) > self.size:
+            del self.pending[next(iter(self.pending))]
+
+        if self.flushing is None:
+            self.flushing = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        self.flushing = None
+        await self.flush()
+
+    async def flush(self):
+        """
+        Write the buffered records in one round trip.
+        """
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zadd(self.key, pending)
+                pipe.zremrangebyrank(self.key, 0, -self.size - 1)
+                await pipe.execute()
+        except RedisError as e:
+            # Recording is best effort and must never fail a request
+            print(f"Failed to record hot renders: {e}")
+
+    async def top(self) -> list[tuple[str, dict[str, Any]]]:
+        """
+        :return: The endpoint and parameters of the recorded renders, most recent first.
+        """
+        try:
+            members = await self.redis.zrevrange(self.key, 0, self.size - 1)
+        except RedisError as e:
+            print(f"Failed to read hot renders: {e}")
+            return []
+        return [tuple(json.loads(member)) for member in members]
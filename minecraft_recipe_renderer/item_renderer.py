@@ -1,12 +1,15 @@
+import threading
 from functools import cache
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Union
 
 import numpy as np
 from PIL import Image, ImageEnhance
 from cachetools import cached, LRUCache
+from cachetools.keys import hashkey
 
 from .classes.model import Model, Element
+from .config import TEXTURE_CACHE_BYTES
 from .utils import to_location, to_path
 
 if TYPE_CHECKING:
@@ -70,9 +73,34 @@ def rotate(vertices, rotation_angles):
     return np.dot(vertices, rotation_matrix.T)
 
 
-@cached(cache=LRUCache(maxsize=128))
-def load_texture(texture: str):
-    return Image.open(texture).convert("RGBA")
+def image_size(image: Image.Image) -> int:
+    return image.width * image.height * 4
+
+
+# Byte-identical files share one decoded image, even across managers
+@cached(
+    cache=LRUCache(maxsize=TEXTURE_CACHE_BYTES // 2, getsizeof=image_size),
+    key=lambda digest, source: hashkey(digest),
+    lock=threading.Lock(),
+)
+def load_texture(digest: str, source: Union[Path, np.ndarray]) -> Image.Image:
+    """
+    :param source: The texture file, or its pixels in the atlas which are copied once.
+    """
+    if isinstance(source, np.ndarray):
+        return Image.fromarray(np.ascontiguousarray(source), "RGBA")
+    return Image.open(source).convert("RGBA")
+
+
+@cached(
+    cache=LRUCache(maxsize=TEXTURE_CACHE_BYTES // 2, getsizeof=image_size),
+    key=lambda digest, source, size: hashkey(digest, size),
+    lock=threading.Lock(),
+)
+def load_scaled_texture(
+    digest: str, source: Union[Path, np.ndarray], size: int
+) -> Image.Image:
+    return load_texture(digest, source).resize((size, size), Image.Resampling.NEAREST)
 
 
 class ItemRenderer:
@@ -84,18 +112,40 @@ class ItemRenderer:
     def __init__(self, resource_manager: "ResourceManager"):
         self.resource_manager = resource_manager
 
-    def get_texture(self, texture_location: str) -> Image.Image:
-        if (
-            texture_location not in self.resource_manager.textures
-            and texture_location != "minecraft:item/missing_texture"
-        ):
-            print("Missing texture", texture_location)
-        return (
-            load_texture(self.resource_manager.textures[texture_location])
-            if texture_location in self.resource_manager.textures
-            else default_image
+    def get_texture_source(
+        self, texture_location: str
+    ) -> Optional[tuple[str, Union[Path, np.ndarray]]]:
+        """
+        :return: The digest of a texture and its pixels in the atlas if it is packed,
+            otherwise its file. None if the texture does not exist.
+        """
+        if texture_location not in self.resource_manager.textures:
+            if texture_location != "minecraft:item/missing_texture":
+                print("Missing texture", texture_location)
+            return None
+        pixels = self.resource_manager.get_texture_array(texture_location)
+        return self.resource_manager.texture_digests[texture_location], (
+            self.resource_manager.textures[texture_location]
+            if pixels is None
+            else pixels
         )
 
+    def get_texture(self, texture_location: str) -> Image.Image:
+        """
+        A texture shared between managers. Must not be modified.
+        """
+        source = self.get_texture_source(texture_location)
+        return default_image if source is None else load_texture(*source)
+
+    def get_scaled_texture(self, texture_location: str, size: int) -> Image.Image:
+        """
+        A texture scaled to a square size, shared between managers. Must not be modified.
+        """
+        source = self.get_texture_source(texture_location)
+        if source is None:
+            return default_image.resize((size, size), Image.Resampling.NEAREST)
+        return load_scaled_texture(*source, size)
+
     def render(self, model: Model, resolution: int):
         if model.location in overrides:
             return load_override_texture(overrides[model.location]).resize(
@@ -110,10 +160,19 @@ class ItemRenderer:
 
             return canvas
         else:
+            item_location = model.location.replace(":item/", ":")
+            if (
+                "layer1" not in model.textures
+                and item_location not in self.resource_manager.default_item_colors
+            ):
+                # Plain items are just their scaled texture
+                return self.get_scaled_texture(
+                    model.textures.get("layer0", "missing"), resolution
+                )
+
             texture1 = self.get_texture(model.textures.get("layer0", "missing"))
 
             # Default color
-            item_location = model.location.replace(":item/", ":")
             if item_location in self.resource_manager.default_item_colors:
                 img_array = np.array(texture1, dtype=np.float32)
                 packed_color = self.resource_manager.default_item_colors[item_location]
@@ -148,8 +207,8 @@ class ItemRenderer:
         canvas: Image.Image,
         depth: np.ndarray,
     ):
-        from_pos = np.asarray(element.from_pos)
-        to_pos = np.asarray(element.to_pos)
+        from_pos = element.from_pos
+        to_pos = element.to_pos
         cuboid_vertices = np.array(
             [
                 [from_pos[0], from_pos[1], from_pos[2]],
@@ -165,16 +224,16 @@ class ItemRenderer:
         )
 
         # Apply rotation
-        cuboid_vertices -= np.asarray(element.rotation.origin, dtype=float)
+        cuboid_vertices -= element.origin
         cuboid_vertices = rotate(
             cuboid_vertices,
             [
-                element.rotation.angle if element.rotation.axis == "x" else 0,
-                element.rotation.angle if element.rotation.axis == "y" else 0,
-                element.rotation.angle if element.rotation.axis == "z" else 0,
+                element.angle if element.axis == "x" else 0,
+                element.angle if element.axis == "y" else 0,
+                element.angle if element.axis == "z" else 0,
             ],
         )
-        cuboid_vertices += element.rotation.origin
+        cuboid_vertices += element.origin
         cuboid_vertices -= 8
 
         # Apply the transformations
@@ -0,0 +1,248 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+from cachetools import TTLCache
+
+from .resource_manager import ResourceManager
+from .utils import deep_getsizeof
+
+
+class ManagerEntry:
+    def __init__(
+        self, key: str, manager: ResourceManager, size: int, generation: int = 0
+    ):
+        self.key = key
+        self.manager = manager
+        self.size = size
+        # The reload generation of the dependency set the manager is up to date with
+        self.generation = generation
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+        self.hits = 0
+
+    def stats(self, pinned: bool) -> dict:
+        now = time.time()
+        return {
+            "dependencies": self.key,
+            "size": self.size,
+            "age": now - self.loaded_at,
+            "idle": now - self.last_used,
+            "hits": self.hits,
+            "generation": self.generation,
+            "pinned": pinned,
+        }
+
+
+class ManagerCache:
+    """
+    Keeps loaded resource managers in memory, bounded by their measured footprint.
+    When the byte budget is exceeded, the least recently used managers are evicted.
+    Pinned managers do not count towards the budget and are never evicted.
+    A manager larger than the whole budget is kept as the only unpinned one.
+    Dependency sets which failed to load are retried with exponential backoff.
+    Managers behind the requested generation, reloaded by another worker, catch up first.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        pinned: Iterable[str] = (),
+        retry_delay: float = 30,
+        max_retry_delay: float = 3600,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries: TTLCache[str, ManagerEntry] = TTLCache(
+            maxsize=max_bytes, ttl=ttl, getsizeof=lambda e: e.size
+        )
+        self.pinned_keys = set(pinned)
+        self.pinned: dict[str, ManagerEntry] = {}
+        self.oversized: Optional[ManagerEntry] = None
+
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.failures: dict[str, tuple[int, float, str]] = {}
+
+        self.lock = threading.Lock()
+        self.loading: dict[str, threading.Lock] = {}
+
+    def _entry(self, key: str) -> Optional[ManagerEntry]:
+        # Called with the lock held
+        entry = self.pinned.get(key) or self.entries.get(key)
+        if entry is None and self.oversized is not None and self.oversized.key == key:
+            if time.time() - self.oversized.loaded_at < self.ttl:
+                entry = self.oversized
+            else:
+                self.oversized = None
+        return entry
+
+    def _store(self, entry: ManagerEntry):
+        # Called with the lock held
+        if entry.key in self.pinned_keys:
+            self.pinned[entry.key] = entry
+        elif entry.size > self.max_bytes:
+            print(
+                f"Manager for {entry.key} exceeds the cache budget ({entry.size} bytes), evicting all others"
+            )
+            self.entries.clear()
+            self.oversized = entry
+        else:
+            self.oversized = None
+            self.entries[entry.key] = entry
+
+    def _lookup(self, key: str):
+        with self.lock:
+            entry = self._entry(key)
+            if entry is not None:
+                entry.hits += 1
+                entry.last_used = time.time()
+            return entry
+
+    @contextmanager
+    def _loading(self, key: str):
+        """
+        Only one thread loads or reloads a given dependency set, others wait for it.
+        """
+        with self.lock:
+            key_lock = self.loading.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                yield
+        finally:
+            with self.lock:
+                if self.loading.get(key) is key_lock:
+                    del self.loading[key]
+
+    def _backoff(self, key: str) -> Optional[str]:
+        """
+        :return: Why the dependency set failed, if it should not be retried yet.
+        """
+        with self.lock:
+            failure = self.failures.get(key)
+        if failure is not None and time.time() < failure[1]:
+            return f"retrying in {int(failure[1] - time.time())}s: {failure[2]}"
+        return None
+
+    def _fail(self, key: str, error: Exception):
+        with self.lock:
+            count = self.failures[key][0] + 1 if key in self.failures else 1
+            delay = min(self.retry_delay * 2 ** (count - 1), self.max_retry_delay)
+            self.failures[key] = (count, time.time() + delay, str(error))
+
+    def get(
+        self, key: str, loader: Callable[[], ResourceManager], generation: int = 0
+    ) -> ResourceManager:
+        """
+        :param generation: The generation the manager must be up to date with.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            if entry.generation < generation and self._backoff(key) is None:
+                try:
+                    reloaded = self.reload(key, generation)
+                    if reloaded is not None:
+                        return reloaded[1]
+                except ValueError as e:
+                    # Keep serving the current manager until the next retry
+                    print(e)
+            return entry.manager
+
+        with self._loading(key):
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry.manager
+
+            backoff = self._backoff(key)
+            if backoff is not None:
+                raise ValueError(f"Dependencies failed to load, {backoff}")
+
+            try:
+                manager = loader()
+            except Exception as e:
+                self._fail(key, e)
+                raise ValueError(f"Dependencies failed to load: {e}") from e
+
+            # A fresh load includes every change up to the requested generation
+            entry = ManagerEntry(key, manager, deep_getsizeof(manager), generation)
+
+            with self.lock:
+                self.failures.pop(key, None)
+                self._store(entry)
+
+            return manager
+
+    def reload(
+        self, key: str, generation: Optional[int] = None
+    ) -> Optional[tuple[ResourceManager, ResourceManager]]:
+        """
+        Apply changes of the dependencies to a loaded manager. The updated manager replaces
+        it, requests in flight finish with the previous one.
+        Failures are recorded, so catching up with a generation backs off like loading.
+        :param generation: The generation to catch up with, skipped if already reached.
+        :return: The previous and the current manager, or None if the set is not loaded.
+        """
+        with self._loading(key):
+            with self.lock:
+                entry = self._entry(key)
+            if entry is None:
+                return None
+            if generation is not None and entry.generation >= generation:
+                return entry.manager, entry.manager
+
+            try:
+                manager = entry.manager.reload()
+            except Exception as e:
+                self._fail(key, e)
+                raise ValueError(f"Dependencies failed to reload: {e}") from e
+
+            with self.lock:
+                self.failures.pop(key, None)
+            if manager is entry.manager:
+                self.advance(key, generation or 0)
+                return manager, manager
+
+            updated = ManagerEntry(
+                key,
+                manager,
+                deep_getsizeof(manager),
+                max(entry.generation, generation or 0),
+            )
+            updated.hits = entry.hits
+
+            with self.lock:
+                self._store(updated)
+
+            return entry.manager, manager
+
+    def advance(self, key: str, generation: int):
+        """
+        Mark a loaded manager as up to date with the given generation.
+        """
+        with self.lock:
+            entry = self._entry(key)
+            if entry is not None:
+                entry.generation = max(entry.generation, generation)
+
+    def managers(self) -> list[ResourceManager]:
+        """
+        :return: All loaded managers, pinned or not.
+        """
+        with self.lock:
+            self.entries.expire()
+            entries = list(self.pinned.values()) + list(self.entries.values())
+            if self.oversized is not None and self._entry(self.oversized.key):
+                entries.append(self.oversized)
+        return [e.manager for e in entries]
+
+    def stats(self) -> list[dict]:
+        with self.lock:
+            self.entries.expire()
+            unpinned = list(self.entries.values())
+            if self.oversized is not None and self._entry(self.oversized.key):
+                unpinned.append(self.oversized)
+            return [e.stats(True) for e in self.pinned.values()] + [
+                e.stats(False) for e in unpinned
+            ]
@@ -1,14 +1,11 @@
 from typing import TYPE_CHECKING
 
-from PIL import Image
-
-from .recipe import Recipe
-from ..classes import Canvas
+from .recipe import Recipe, RenderPlan, resolve_models
 from ..classes.item import Item
 from ..utils import to_ingredient
 
 if TYPE_CHECKING:
-    from .. import ItemRenderer, ResourceManager
+    from .. import ResourceManager
 
 
 def load_pattern_recipe(pattern: list, key: dict):
@@ -56,19 +53,26 @@ class CraftingShapedRecipe(Recipe):
                             expanded[-1][-1].append(i)
         return expanded
 
-    def render(
-        self,
-        item_renderer: "ItemRenderer",
-        resolution: int = 1,
-        max_variations: int = 1,
-        print_name: bool = True,
-    ) -> list[Image.Image]:
+    def get_size(self) -> tuple[int, int]:
+        size = max(len(self.recipe), len(self.recipe[0]))
+        return 72 + size * 18, 26 + 18 * size
+
+    def get_ingredients(self) -> list[str]:
+        return [
+            i
+            for row in self.recipe
+            for ingredients in row
+            if ingredients
+            for i in ingredients
+        ]
+
+    def compile(self, resource_manager: "ResourceManager") -> RenderPlan:
         size = max(len(self.recipe), len(self.recipe[0]))
         ox = (size - len(self.recipe[0])) // 2
         oy = (size - len(self.recipe)) // 2
 
         # Flatten ingredient tags into items
-        ingredients = self._expand_ingredients(item_renderer.resource_manager)
+        ingredients = self._expand_ingredients(resource_manager)
 
         variations = 0
         for row in ingredients:
@@ -76,51 +80,40 @@ class CraftingShapedRecipe(Recipe):
                 if ingredient:
                     variations = max(variations, len(ingredient))
 
-        images = []
-        for variation in range(min(max_variations, variations)):
-            canvas = Canvas(72 + size * 18, 26 + 18 * size, resolution)
-            canvas.box("menu", 0, 0, canvas.width, canvas.height)
-
+        operations = [
             # Arrow
-            canvas.texture("arrow", 12 + 18 * size, 18 + (size - 1) * 9)
-
+            ("texture", "arrow", 12 + 18 * size, 18 + (size - 1) * 9),
             # Text
-            if print_name:
-                name = item_renderer.resource_manager.get_lang(self.result.id)
-            else:
-                name = "Crafting"
-            canvas.text(name, 7, 6)
-
-            # Ingredients
-            for x in range(size):
-                for y in range(size):
-                    ingredient = (
-                        ingredients[y - oy][x - ox]
-                        if 0 <= y - oy < len(ingredients)
-                        and 0 <= x - ox < len(ingredients[y - oy])
-                        else None
-                    )
-                    item = (
-                        Item(ingredient[variation % len(ingredient)])
-                        if ingredient
-                        else None
-                    )
-                    canvas.slot(
-                        item_renderer,
-                        item,
-                        7 + x * 18,
-                        18 + y * 18,
-                    )
-
-            # Result
-            canvas.slot(
-                item_renderer,
-                self.result,
+            ("title", 7, 6),
+        ]
+
+        # Ingredients
+        for x in range(size):
+            for y in range(size):
+                ingredient = (
+                    ingredients[y - oy][x - ox]
+                    if 0 <= y - oy < len(ingredients)
+                    and 0 <= x - ox < len(ingredients[y - oy])
+                    else None
+                )
+                models = resolve_models(resource_manager, ingredient or [])
+                operations.append(("slot", 7 + x * 18, 18 + y * 18, 1, models))
+
+        # Result
+        operations.append(
+            (
+                "slot",
                 41 + 18 * size,
                 14 + (size - 1) * 9,
                 4,
+                resolve_models(resource_manager, [self.result.id]),
             )
-
-            images.append(canvas.image)
-
-        return images
+        )
+
+        return RenderPlan(
+            *self.get_size(),
+            variations,
+            resource_manager.get_lang(self.result.id),
+            "Crafting",
+            tuple(operations),
+        )
@@ -1,11 +1,122 @@
+from typing import TYPE_CHECKING, Optional
+
 from PIL import Image
 
 from minecraft_recipe_renderer import ItemRenderer
+from ..classes import Canvas, Model
+from ..utils import to_location
+
+if TYPE_CHECKING:
+    from .. import ResourceManager
+
+
+class RenderPlan:
+    """
+    Everything a recipe draws, resolved against a resource manager once.
+    Operations are drawn in order on top of the menu background:
+    ("texture", name, x, y), ("text", text, x, y), ("title", x, y) and
+    ("slot", x, y, margin, models), where a slot cycles through its models per variation.
+    """
+
+    __slots__ = ("width", "height", "variations", "title", "label", "operations")
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        variations: int,
+        title: str,
+        label: str,
+        operations: tuple[tuple, ...],
+    ):
+        self.width = width
+        self.height = height
+        self.variations = variations
+        # The title is the result's name, the label is used when names are not printed
+        self.title = title
+        self.label = label
+        self.operations = operations
+
+
+# Stored for recipes which failed to compile, they have nothing to render
+FAILED_PLAN = RenderPlan(0, 0, 0, "", "", ())
+
+
+def resolve_models(
+    resource_manager: "ResourceManager", items: list[str]
+) -> tuple[Optional[Model], ...]:
+    return tuple(resource_manager.get_model(to_location(item)) for item in items)
 
 
 class Recipe:
     def __init__(self, recipe: dict):
-        pass
+        self.plan: Optional[RenderPlan] = None
+
+    def get_size(self) -> tuple[int, int]:
+        """
+        The size of a rendered variation in GUI pixels, before scaling by the resolution.
+        """
+        raise NotImplementedError
+
+    def get_ingredients(self) -> list[str]:
+        """
+        Every item or #tag the recipe consumes, tags are not expanded.
+        """
+        raise NotImplementedError
+
+    def compile(self, resource_manager: "ResourceManager") -> RenderPlan:
+        raise NotImplementedError
+
+    def compile_plan(
+        self, resource_manager: "ResourceManager", name: str = ""
+    ) -> RenderPlan:
+        """
+        Compile and store the plan. Failures are logged once and store an empty plan,
+        so the recipe is skipped instead of failing every sheet it is part of.
+        """
+        try:
+            self.plan = self.compile(resource_manager)
+        except Exception as e:
+            print(f"Failed to compile recipe {name or type(self).__name__}: {e}")
+            self.plan = FAILED_PLAN
+        return self.plan
+
+    def get_plan(self, resource_manager: "ResourceManager") -> RenderPlan:
+        # Plans are compiled in post_load, this only covers managers used before that
+        if self.plan is None:
+            return self.compile_plan(resource_manager)
+        return self.plan
+
+    def get_variations(self, resource_manager: "ResourceManager") -> int:
+        """
+        The number of distinct variations, zero if there is nothing to render.
+        """
+        return self.get_plan(resource_manager).variations
+
+    def render_variation(
+        self,
+        item_renderer: ItemRenderer,
+        resolution: int,
+        variation: int,
+        print_name: bool = True,
+    ) -> Image.Image:
+        plan = self.get_plan(item_renderer.resource_manager)
+
+        canvas = Canvas(plan.width, plan.height, resolution)
+        canvas.box("menu", 0, 0, canvas.width, canvas.height)
+        for operation in plan.operations:
+            kind = operation[0]
+            if kind == "texture":
+                canvas.texture(*operation[1:])
+            elif kind == "text":
+                canvas.text(*operation[1:])
+            elif kind == "title":
+                canvas.text(plan.title if print_name else plan.label, *operation[1:])
+            elif kind == "slot":
+                _, x, y, margin, models = operation
+                model = models[variation % len(models)] if models else None
+                canvas.model_slot(item_renderer, model, x, y, margin)
+        return canvas.image
 
     def render(
         self,
@@ -14,4 +125,8 @@ class Recipe:
         max_variations: int = 1,
         print_name: bool = True,
     ) -> list[Image.Image]:
-        raise NotImplementedError
+        variations = self.get_variations(item_renderer.resource_manager)
+        return [
+            self.render_variation(item_renderer, resolution, variation, print_name)
+            for variation in range(min(max_variations, variations))
+        ]
@@ -1,14 +1,11 @@
 from typing import TYPE_CHECKING
 
-from PIL import Image
-
-from .recipe import Recipe
-from ..classes import Canvas
+from .recipe import Recipe, RenderPlan, resolve_models
 from ..classes.item import Item
 from ..utils import to_ingredient
 
 if TYPE_CHECKING:
-    from .. import ItemRenderer
+    from .. import ResourceManager
 
 
 class SmeltingRecipe(Recipe):
@@ -27,35 +24,29 @@ class SmeltingRecipe(Recipe):
     def get_name(self) -> str:
         return "Furnace"
 
-    def render(
-        self,
-        item_renderer: "ItemRenderer",
-        resolution: int = 1,
-        max_variations: int = 1,
-        print_name: bool = True,
-    ) -> list[Image.Image]:
-        images = []
-        for variation in range(min(max_variations, len(self.ingredient))):
-            canvas = Canvas(94, 69, resolution)
-            canvas.box("menu", 0, 0, canvas.width, canvas.height)
-
-            # Arrow
-            canvas.texture("arrow", 34, 29)
-            canvas.texture("burn", 7, 36)
-
-            # Text
-            canvas.text(self.get_name(), 7, 6)
-
-            # Cooking time
-            canvas.text(f"{self.cookingTime} ticks", 7, 55)
-
-            # Ingredients
-            item = Item(self.ingredient[variation])
-            canvas.slot(item_renderer, item, 7, 18)
-
-            # Result
-            canvas.slot(item_renderer, self.result, 63, 24, 4)
-
-            images.append(canvas.image)
-
-        return images
+    def get_size(self) -> tuple[int, int]:
+        return 94, 69
+
+    def get_ingredients(self) -> list[str]:
+        return list(self.ingredient)
+
+    def compile(self, resource_manager: "ResourceManager") -> RenderPlan:
+        return RenderPlan(
+            *self.get_size(),
+            len(self.ingredient),
+            self.get_name(),
+            self.get_name(),
+            (
+                # Arrow
+                ("texture", "arrow", 34, 29),
+                ("texture", "burn", 7, 36),
+                # Text
+                ("title", 7, 6),
+                # Cooking time
+                ("text", f"{self.cookingTime} ticks", 7, 55),
+                # Ingredients
+                ("slot", 7, 18, 1, resolve_models(resource_manager, self.ingredient)),
+                # Result
+                ("slot", 63, 24, 4, resolve_models(resource_manager, [self.result.id])),
+            ),
+        )
@@ -1,14 +1,11 @@
 from typing import TYPE_CHECKING
 
-from PIL import Image
-
-from .recipe import Recipe
-from ..classes import Canvas
+from .recipe import Recipe, RenderPlan, resolve_models
 from ..classes.item import Item
 from ..utils import to_ingredient
 
 if TYPE_CHECKING:
-    from .. import ItemRenderer
+    from .. import ResourceManager
 
 
 class SmithingTransformRecipe(Recipe):
@@ -20,43 +17,28 @@ class SmithingTransformRecipe(Recipe):
         self.addition = to_ingredient(recipe["addition"])
         self.result = Item(recipe["result"])
 
-    def render(
-        self,
-        item_renderer: "ItemRenderer",
-        resolution: int = 1,
-        max_variations: int = 1,
-        print_name: bool = True,
-    ) -> list[Image.Image]:
-        images = []
-        for variation in range(
-            min(max_variations, len(self.template), len(self.base), len(self.addition))
-        ):
-            canvas = Canvas(125, 46, resolution)
-            canvas.box("menu", 0, 0, canvas.width, canvas.height)
-
-            # Arrow
-            canvas.texture("arrow", 68, 20)
-
-            # Text
-            if print_name:
-                name = item_renderer.resource_manager.get_lang(self.result.id)
-            else:
-                name = "Smithing Table"
-            canvas.text(name, 7, 6)
-
-            # Ingredients
-            item = Item(self.template[variation % len(self.template)])
-            canvas.slot(item_renderer, item, 7, 18)
-
-            item = Item(self.base[variation % len(self.base)])
-            canvas.slot(item_renderer, item, 25, 18)
-
-            item = Item(self.addition[variation % len(self.addition)])
-            canvas.slot(item_renderer, item, 43, 18)
-
-            # Result
-            canvas.slot(item_renderer, self.result, 98, 18)
-
-            images.append(canvas.image)
-
-        return images
+    def get_size(self) -> tuple[int, int]:
+        return 125, 46
+
+    def get_ingredients(self) -> list[str]:
+        return self.template + self.base + self.addition
+
+    def compile(self, resource_manager: "ResourceManager") -> RenderPlan:
+        return RenderPlan(
+            *self.get_size(),
+            min(len(self.template), len(self.base), len(self.addition)),
+            resource_manager.get_lang(self.result.id),
+            "Smithing Table",
+            (
+                # Arrow
+                ("texture", "arrow", 68, 20),
+                # Text
+                ("title", 7, 6),
+                # Ingredients
+                ("slot", 7, 18, 1, resolve_models(resource_manager, self.template)),
+                ("slot", 25, 18, 1, resolve_models(resource_manager, self.base)),
+                ("slot", 43, 18, 1, resolve_models(resource_manager, self.addition)),
+                # Result
+                ("slot", 98, 18, 1, resolve_models(resource_manager, [self.result.id])),
+            ),
+        )
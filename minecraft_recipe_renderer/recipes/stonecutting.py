@@ -1,14 +1,11 @@
 from typing import TYPE_CHECKING
 
-from PIL import Image
-
-from .recipe import Recipe
-from ..classes import Canvas
+from .recipe import Recipe, RenderPlan, resolve_models
 from ..classes.item import Item
 from ..utils import to_ingredient
 
 if TYPE_CHECKING:
-    from .. import ItemRenderer
+    from .. import ResourceManager
 
 
 class StonecuttingRecipe(Recipe):
@@ -18,35 +15,26 @@ class StonecuttingRecipe(Recipe):
         self.ingredient = to_ingredient(recipe["ingredient"])
         self.result = Item(recipe["result"])
 
-    def render(
-        self,
-        item_renderer: "ItemRenderer",
-        resolution: int = 1,
-        max_variations: int = 1,
-        print_name: bool = True,
-    ) -> list[Image.Image]:
-        images = []
-        for variation in range(min(max_variations, len(self.ingredient))):
-            canvas = Canvas(86, 43, resolution)
-            canvas.box("menu", 0, 0, canvas.width, canvas.height)
-
-            # Arrow
-            canvas.texture("arrow", 32, 20)
-
-            # Text
-            if print_name:
-                name = item_renderer.resource_manager.get_lang(self.result.id)
-            else:
-                name = "Stone Cutting"
-            canvas.text(name, 7, 6)
-
-            # Ingredients
-            item = Item(self.ingredient[variation])
-            canvas.slot(item_renderer, item, 7, 18)
-
-            # Result
-            canvas.slot(item_renderer, self.result, 61, 18)
-
-            images.append(canvas.image)
-
-        return images
+    def get_size(self) -> tuple[int, int]:
+        return 86, 43
+
+    def get_ingredients(self) -> list[str]:
+        return list(self.ingredient)
+
+    def compile(self, resource_manager: "ResourceManager") -> RenderPlan:
+        return RenderPlan(
+            *self.get_size(),
+            len(self.ingredient),
+            resource_manager.get_lang(self.result.id),
+            "Stone Cutting",
+            (
+                # Arrow
+                ("texture", "arrow", 32, 20),
+                # Text
+                ("title", 7, 6),
+                # Ingredients
+                ("slot", 7, 18, 1, resolve_models(resource_manager, self.ingredient)),
+                # Result
+                ("slot", 61, 18, 1, resolve_models(resource_manager, [self.result.id])),
+            ),
+        )
@@ -1,18 +1,42 @@
+import copy
+import filecmp
 import hashlib
 import json
-import zipfile
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Generator
+from typing import Iterable, Optional
 from urllib.parse import urlparse, quote, unquote, urlunparse
 
-import requests
-from git import Repo
+import numpy as np
+from git import Git, Repo
 
 from .classes.model import Model, DEFAULT_ITEM_MODEL
+from .disk_cache import DiskCache
+from .download import download, expected_sha1
 from .recipes import RECIPE_REGISTRY
 from .recipes.recipe import Recipe
+from .resource_walker import find_resource_roots, walk_resources
+from .tags import TagIndex
+from .texture_atlas import TextureAtlas
 from .utils import to_location
 
+COMMIT_PATTERN = re.compile("[0-9a-f]{40}")
+
+# Only these directories of a repository are checked out
+REPOSITORY_SPARSE_PATTERNS = ("resources/",)
+
+# The models an item is rendered from, as prefix and suffix of its path, by priority
+ITEM_MODEL_PATTERNS = (
+    ("item/", ""),
+    ("item/", "_00"),
+    ("block/", "_inventory"),
+    ("block/", ""),
+)
+
 
 def looks_like_file(url: str) -> bool:
     sanitized = sanitize_url(url)
@@ -28,6 +52,67 @@ def parse_git_link(link: str) -> tuple[str, Optional[str]]:
         return split[0], None
 
 
+def resolve_commit(repo: str, ref: Optional[str]) -> str:
+    """
+    Resolve a branch or tag to the commit it currently points to.
+    Full commit hashes are already pinned and returned without accessing the network.
+    """
+    if ref and COMMIT_PATTERN.fullmatch(ref):
+        return ref
+
+    ref = ref or "HEAD"
+    refs = {}
+    for line in Git().ls_remote(repo, ref, ref + "^{}").splitlines():
+        commit, name = line.split("\t", 1)
+        refs[name] = commit
+
+    # Annotated tags are peeled to their commit
+    for name in (f"refs/tags/{ref}^{{}}", f"refs/tags/{ref}", f"refs/heads/{ref}", ref):
+        if name in refs:
+            return refs[name]
+    raise ValueError(f"Unknown reference {ref} in {repo}")
+
+
+def sources_fingerprint(sources: list[Path]) -> str:
+    # Cache entries are keyed by URL or by commit, their names identify the content
+    return hashlib.sha256(json.dumps([s.name for s in sources]).encode()).hexdigest()
+
+
+def same_content(a: Path, b: Path) -> bool:
+    try:
+        return os.path.samefile(a, b) or filecmp.cmp(a, b, shallow=False)
+    except OSError:
+        return False
+
+
+def changed_resources(
+    old_root: Path,
+    old_files: list[tuple[str, Path, str]],
+    new_root: Path,
+    new_files: list[tuple[str, Path, str]],
+) -> set[tuple[str, str]]:
+    """
+    Compare the files of two versions of a dependency.
+    :return: The category and name of every resource added, removed or modified.
+    """
+    before: dict[tuple[str, str], list[Path]] = {}
+    for category, path, name in old_files:
+        before.setdefault((category, name), []).append(path)
+    after: dict[tuple[str, str], list[Path]] = {}
+    for category, path, name in new_files:
+        after.setdefault((category, name), []).append(path)
+
+    changed = set()
+    for key in before.keys() | after.keys():
+        a, b = before.get(key, []), after.get(key, [])
+        if len(a) != len(b) or any(
+            p.relative_to(old_root) != q.relative_to(new_root) or not same_content(p, q)
+            for p, q in zip(a, b)
+        ):
+            changed.add(key)
+    return changed
+
+
 def sanitize_url(url):
     parsed = urlparse(url)
 
@@ -57,27 +142,64 @@ def sanitize_url(url):
     return sanitized_url
 
 
-def list_files(
-    root: Path, ext: str, namespace: str
-) -> Generator[tuple[Path, str], None, None]:
-    for path in root.rglob(f"*.{ext}"):
-        rel = path.relative_to(root)
-        yield path, namespace + ":" + str(rel.parent / rel.stem)
+known_dependencies = {
+    "1.20.1": "https://piston-data.mojang.com/v1/objects/a7e5a6024bfd3cd614625aa05629adf760020304/client.jar"
+}
+
+
+def parse_dependencies(minecraft_version: str, dependencies: str) -> list[str]:
+    return [
+        sanitize_url(known_dependencies[d] if d in known_dependencies else d.strip())
+        for d in (dependencies.split(";") + [minecraft_version])
+        if d.strip()
+    ]
 
 
 class ResourceManager:
-    def __init__(self, cache: Path = Path("cache")):
+    def __init__(
+        self,
+        cache: Path = Path("cache"),
+        texture_atlas: bool = False,
+        disk_cache: Optional[DiskCache] = None,
+    ):
+        """
+        :param cache: The directory dependencies are downloaded and extracted to.
+        :param texture_atlas: Pack item and block textures into a memory mapped atlas per dependency.
+        :param disk_cache: The managed cache to use, defaults to an unbounded one in the cache directory.
+        """
         self.cache = cache
+        self.texture_atlas = texture_atlas
+        self.disk_cache = disk_cache or DiskCache(cache)
+
+        # The loaded dependencies, their directories and files, in load order
+        self.dependencies: list[str] = []
+        self.sources: list[Path] = []
+        self.source_files: list[list[tuple[str, Path, str]]] = []
+        self.texture_atlases: list[tuple[Path, TextureAtlas]] = []
 
         self.recipes: dict[str, Recipe] = {}
-        self.tags: dict[str, set[str]] = {}
+        # Tags as loaded, possibly referencing other tags, expanded into the index in post_load
+        self.tag_definitions: dict[str, set[str]] = {}
+        self.tags: TagIndex = TagIndex({})
         self.models: dict[str, Model] = {}
         self.lang: dict[str, str] = {}
         self.textures: dict[str, Path] = {}
+        # Content hashes of the texture files, identical files share decoded images
+        self.texture_digests: dict[str, str] = {}
         self.default_item_colors: dict[str, int] = {}
 
+        # Built in post_load, item or #tag to the sorted names of matching recipes.
+        # Ingredients are indexed as written, tag ingredients are matched in recipes_using.
+        self.recipes_by_output: dict[str, list[str]] = {}
+        self.recipes_by_input: dict[str, list[str]] = {}
+
         self.models["minecraft:builtin/generated"] = DEFAULT_ITEM_MODEL
 
+        # Identifies the loaded content, changed resources record the fingerprint of the reload
+        self.fingerprint = ""
+        self.loaded_fingerprint = ""
+        self.resource_fingerprints: dict[str, str] = {}
+
     def get_model(self, location: str) -> Model:
         namespace, path = location.split(":", 1)
 
@@ -93,13 +215,25 @@ class ResourceManager:
     def post_load(self):
         self._post_load_models()
         self._post_load_tags()
-        self._post_load_recipe_tag()
+        self._post_load_plans()
+        self._post_load_recipe_indexes()
+        if self.texture_atlas:
+            self._post_load_texture_atlases()
+        self.fingerprint = self.loaded_fingerprint = sources_fingerprint(self.sources)
 
-    def _post_load_models(self):
+    def _post_load_models(self, names: Optional[set[str]] = None):
+        """
+        :param names: Only resolve these models, their ancestors must be resolved already.
+        """
+        models = (
+            self.models
+            if names is None
+            else {name: self.models[name] for name in names if name in self.models}
+        )
         done = False
         while not done:
             done = True
-            for name, model in self.models.items():
+            for name, model in models.items():
                 if model.parent and not model.resolved:
                     if model.parent in self.models:
                         parent = self.models[model.parent]
@@ -110,28 +244,82 @@ class ResourceManager:
                         print(f"Missing parent model: {model.parent} for {name}")
 
     def _post_load_tags(self):
+        # Expand a copy, the definitions stay intact for later reloads
+        expanded = {name: set(tags) for name, tags in self.tag_definitions.items()}
         done = False
         while not done:
             done = True
-            for tags in self.tags.values():
+            for tags in expanded.values():
                 for tag in list(tags):
                     if tag.startswith("#"):
                         done = False
                         tags.remove(tag)
-                        if tag[1:] in self.tags:
-                            tags.update(self.tags[tag[1:]])
+                        if tag[1:] in expanded:
+                            tags.update(expanded[tag[1:]])
                         else:
                             print(f"Missing tag: {tag}")
 
-    def _post_load_recipe_tag(self):
+        self._post_load_recipe_tag(expanded)
+        self.tags = TagIndex(expanded)
+
+    def _post_load_recipe_tag(self, tags: dict[str, set[str]]):
         # Create a pseudo tag with all recipe outputs
         for recipe in self.recipes.values():
             if hasattr(recipe, "result"):
                 namespace, path = recipe.result.id.split(":", 1)
                 t = namespace + ":recipes"
-                if t not in self.tags:
-                    self.tags[t] = set()
-                self.tags[t].add(recipe.result.id)
+                if t not in tags:
+                    tags[t] = set()
+                tags[t].add(recipe.result.id)
+
+    def _post_load_plans(self):
+        # Resolve everything recipes draw once, shared by all requests to this manager
+        for name, recipe in self.recipes.items():
+            recipe.compile_plan(self, name)
+
+    def _post_load_recipe_indexes(self):
+        by_output: dict[str, set[str]] = {}
+        by_input: dict[str, set[str]] = {}
+        for name, recipe in self.recipes.items():
+            if hasattr(recipe, "result"):
+                by_output.setdefault(recipe.result.id, set()).add(name)
+
+            for ingredient in recipe.get_ingredients():
+                by_input.setdefault(ingredient, set()).add(name)
+
+        self.recipes_by_output = {k: sorted(v) for k, v in by_output.items()}
+        self.recipes_by_input = {k: sorted(v) for k, v in by_input.items()}
+
+    def recipes_using(self, ingredient: str) -> list[str]:
+        """
+        :param ingredient: An item, which also matches recipes using any of its tags, or a #tag.
+        :return: The sorted names of recipes consuming the ingredient.
+        """
+        if ingredient.startswith("#"):
+            return self.recipes_by_input.get(ingredient, [])
+        names = set(self.recipes_by_input.get(ingredient, ()))
+        for tag in self.tags.tags_of(ingredient):
+            names.update(self.recipes_by_input.get("#" + tag, ()))
+        return sorted(names)
+
+    def _post_load_texture_atlases(self):
+        self.texture_atlases = [
+            (root, TextureAtlas.load_or_build(root, files))
+            for root, files in zip(self.sources, self.source_files)
+        ]
+
+    def get_texture_array(self, location: str) -> Optional[np.ndarray]:
+        """
+        :return: A read-only view of the texture from the atlas, or None if it is not packed.
+        """
+        path = self.textures.get(location)
+        if path is None:
+            return None
+        # Later dependencies override earlier ones, like in the texture registry
+        for root, atlas in reversed(self.texture_atlases):
+            if location in atlas and path.is_relative_to(root):
+                return atlas.get(location)
+        return None
 
     def load_recipe(self, path: Path, name: str):
         try:
@@ -152,10 +340,14 @@ class ResourceManager:
                 else:
                     processed_tags.add(to_location(tag["id"]))
 
-            if "replace" in tags and tags["replace"] or name not in self.tags:
-                self.tags[name] = processed_tags
+            if (
+                "replace" in tags
+                and tags["replace"]
+                or name not in self.tag_definitions
+            ):
+                self.tag_definitions[name] = processed_tags
             else:
-                self.tags[name] |= processed_tags
+                self.tag_definitions[name] |= processed_tags
         except Exception:
             print(f"Error loading tags: {name}")
 
@@ -172,116 +364,323 @@ class ResourceManager:
             print(f"Error loading lang: {path}")
 
     def register_texture(self, path: Path, name: str):
+        try:
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            print(f"Error loading texture: {name}")
+            return
         self.textures[name] = path
+        self.texture_digests[name] = sys.intern(digest)
 
     def load_resources(self, root: Path):
         """
         Load the resource pack.
         :param root: The root of the pack, containing assets, data, ...
         """
-
-        namespaces = set()
-        for namespace in root.glob("assets/*/"):
-            namespaces.add(namespace.name)
-        for namespace in root.glob("data/*/"):
-            namespaces.add(namespace.name)
-
-        for namespace in namespaces:
-            for path, name in list_files(
-                root / f"data/{namespace}/recipe", "json", namespace
-            ):
-                self.load_recipe(path, name)
-            for path, name in list_files(
-                root / f"data/{namespace}/recipes", "json", namespace
-            ):
-                self.load_recipe(path, name)
-
-            for path, name in list_files(
-                root / f"data/{namespace}/tags/item", "json", namespace
-            ):
-                self.load_tags(path, name)
-
-            for path, name in list_files(
-                root / f"data/{namespace}/tags/items", "json", namespace
-            ):
-                self.load_tags(path, name)
-
-            for path, name in list_files(
-                root / f"assets/{namespace}/models", "json", namespace
-            ):
-                self.load_model(path, name)
-
-            lang_path = root / f"assets/{namespace}/lang/en_us.json"
-            if lang_path.exists():
+        self.load_files(walk_resources(root))
+
+    def load_files(self, files: Iterable[tuple[str, Path, str]]):
+        loaders = {
+            "recipe": self.load_recipe,
+            "tag": self.load_tags,
+            "model": self.load_model,
+            "texture": self.register_texture,
+        }
+        for category, path, name in files:
+            if category == "lang":
                 self.load_lang(path)
-
-            for path, name in list_files(
-                root / f"assets/{namespace}/textures", "png", namespace
-            ):
-                self.register_texture(path, name)
-
-            colors_path = root / f"assets/{namespace}/default_item_colors.json"
-            if colors_path.exists():
-                self.default_item_colors.update(json.loads(colors_path.read_text()))
+            elif category == "colors":
+                self.default_item_colors.update(json.loads(path.read_text()))
+            else:
+                loaders[category](path, name)
 
     def scan_resources(self, path: Path):
         """
         Scan for resources in the given path.
         :param path: The path to scan.
         """
-        for root in path.glob("**/resources/"):
+        for root in find_resource_roots(path):
             self.load_resources(root)
 
     def load_dependency(self, url: str):
+        self.load_source(url, self.fetch_dependency(url))
+
+    def load_dependencies(self, urls: list[str], workers: int = 4):
+        """
+        Fetch the dependencies in parallel, but load them in the given order.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(urls)))) as pool:
+            # Results arrive in order, so loading overlaps with the remaining fetches
+            for url, root in zip(urls, pool.map(self.fetch_dependency, urls)):
+                self.load_source(url, root)
+
+    def load_source(self, url: str, root: Path):
+        files = self.walk_source(url, root)
+        self.dependencies.append(url)
+        self.sources.append(root)
+        self.source_files.append(files)
+        self.load_files(files)
+
+    @staticmethod
+    def walk_source(url: str, root: Path) -> list[tuple[str, Path, str]]:
+        """
+        :return: The files of a dependency, in load order.
+        """
+        files = [f for pack in find_resource_roots(root) for f in walk_resources(pack)]
+        if looks_like_file(url):
+            files.extend(walk_resources(root))
+        return files
+
+    def fetch_dependency(self, url: str) -> Path:
+        """
+        Download a dependency to the cache if missing.
+        Does not modify the manager, so multiple dependencies can be fetched concurrently.
+        :return: The directory of the dependency.
+        """
         if looks_like_file(url):
-            self.load_zip(url)
+            return self.fetch_zip(url)
         else:
-            self.load_repository(url)
+            return self.fetch_repository(url)
 
     def load_zip(self, url: str):
         """
         Load a jar file from a URL.
         :param url: The URL to the jar file.
         """
-        cache_dir = self.cache / (hashlib.sha256(url.encode()).hexdigest())
+        self.load_source(url, self.fetch_zip(url))
+
+    def fetch_zip(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        cache_dir = self.disk_cache.entry(key)
         if not cache_dir.exists():
-            cache_file = self.cache / (
-                hashlib.sha256(url.encode()).hexdigest() + ".zip"
-            )
-            self.cache.mkdir(parents=True, exist_ok=True)
-            with cache_file.open("wb") as f:
-                response = requests.get(
-                    url,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                    },
-                )
-                f.write(response.content)
-
-            with zipfile.ZipFile(cache_file, "r") as ref:
-                ref.extractall(cache_dir)
-
-            cache_file.unlink()
-
-        self.scan_resources(cache_dir)
-        self.load_resources(cache_dir)
+            with self.disk_cache.lock(key):
+                # Another worker may have extracted it while waiting for the lock
+                if not cache_dir.exists():
+                    cache_file = self.cache / (key + ".zip")
+                    download(url, cache_file, sha1=expected_sha1(url))
+
+                    with self.disk_cache.staging(key) as staging:
+                        self.disk_cache.extract_zip(cache_file, staging)
+
+                    cache_file.unlink()
+            self.disk_cache.evict(keep=(key,))
+
+        self.disk_cache.touch(key)
+        return cache_dir
 
     def load_repository(self, url: str):
+        """
+        Load the resources of a git repository, at the commit a branch or tag points to.
+        Only the resources directories of that single commit are fetched.
+        """
+        self.load_source(url, self.fetch_repository(url))
+
+    def fetch_repository(self, url: str) -> Path:
         repo, tag = parse_git_link(url)
-        cache_dir = self.cache / (
-            hashlib.sha256((repo + str(tag)).encode()).hexdigest()
-        )
+        commit = resolve_commit(repo, tag)
+        key = hashlib.sha256((repo + commit).encode()).hexdigest()
+        cache_dir = self.disk_cache.entry(key)
 
-        if cache_dir.exists():
-            repo = Repo(cache_dir)
-            repo.remotes.origin.pull()
-            repo.git.checkout(tag)
+        # A commit never changes, an existing entry is complete
+        if not cache_dir.exists():
+            with self.disk_cache.lock(key):
+                if not cache_dir.exists():
+                    with self.disk_cache.staging(key) as staging:
+                        git = Repo.init(staging).git
+                        git.remote("add", "origin", repo)
+                        git.sparse_checkout(
+                            "set", "--no-cone", *REPOSITORY_SPARSE_PATTERNS
+                        )
+                        git.fetch(
+                            "--depth", "1", "--filter=blob:none", "origin", commit
+                        )
+                        git.checkout(commit)
+                        shutil.rmtree(staging / ".git")
+            self.disk_cache.evict(keep=(key,))
+
+        self.disk_cache.touch(key)
+        return cache_dir
+
+    def touch(self):
+        """
+        Mark the dependencies as in use, so they are not evicted from the disk cache.
+        """
+        for source in self.sources:
+            self.disk_cache.touch(source.name)
+
+    def reload(self) -> "ResourceManager":
+        """
+        Fetch the dependencies again and apply only the resources which changed.
+        A loaded manager may be in use by other threads, so the changes are applied to a
+        copy sharing all unchanged resources.
+        :return: The updated manager, or this one if no dependency moved.
+        """
+        sources = list(self.sources)
+        source_files = list(self.source_files)
+        changed: set[tuple[str, str]] = set()
+        for i, url in enumerate(self.dependencies):
+            root = self.fetch_dependency(url)
+            if root != sources[i]:
+                files = self.walk_source(url, root)
+                changed |= changed_resources(sources[i], source_files[i], root, files)
+                sources[i] = root
+                source_files[i] = files
+
+        if sources == self.sources:
+            return self
+
+        manager = copy.copy(self)
+        for attribute in (
+            "recipes",
+            "tag_definitions",
+            "models",
+            "lang",
+            "textures",
+            "texture_digests",
+            "default_item_colors",
+            "resource_fingerprints",
+        ):
+            setattr(manager, attribute, dict(getattr(self, attribute)))
+        manager.sources = sources
+        manager.source_files = source_files
+        manager._apply_changes(changed)
+        return manager
+
+    def _apply_changes(self, changed: set[tuple[str, str]]):
+        index: dict[tuple[str, str], list[Path]] = {}
+        for files in self.source_files:
+            for category, path, name in files:
+                index.setdefault((category, name), []).append(path)
+
+        names: dict[str, set[str]] = {}
+        for category, name in changed:
+            names.setdefault(category, set()).add(name)
+
+        if changed:
+            self.fingerprint = sources_fingerprint(self.sources)
+            for category, name in changed:
+                self.resource_fingerprints[f"{category}:{name}"] = self.fingerprint
+
+        # Unchanged textures only moved to the new directories
+        textures = names.get("texture", set())
+        for name in list(self.textures):
+            if name not in textures and ("texture", name) in index:
+                self.textures[name] = index["texture", name][-1]
+        for name in textures:
+            self.textures.pop(name, None)
+            self.texture_digests.pop(name, None)
+            for path in index.get(("texture", name), []):
+                self.register_texture(path, name)
+
+        for name in names.get("recipe", ()):
+            self.recipes.pop(name, None)
+            for path in index.get(("recipe", name), []):
+                self.load_recipe(path, name)
+
+        for name in names.get("tag", ()):
+            self.tag_definitions.pop(name, None)
+            for path in index.get(("tag", name), []):
+                self.load_tags(path, name)
+
+        # Lang files and item colors override each other across namespaces, keep their order
+        if "lang" in names or "colors" in names:
+            self.lang = {}
+            self.default_item_colors = {}
+            for files in self.source_files:
+                for category, path, name in files:
+                    if category in ("lang", "colors"):
+                        self.load_files([(category, path, name)])
+
+        # Descendants of changed models inherited from them, they are loaded again too
+        models = set(names.get("model", ()))
+        if models:
+            children: dict[str, list[str]] = {}
+            for name, model in self.models.items():
+                if model.parent:
+                    children.setdefault(model.parent, []).append(name)
+            stack = list(models)
+            while stack:
+                for child in children.get(stack.pop(), ()):
+                    if child not in models:
+                        models.add(child)
+                        stack.append(child)
+
+            for name in models:
+                self.models.pop(name, None)
+                for path in index.get(("model", name), []):
+                    self.load_model(path, name)
+            self.models.setdefault("minecraft:builtin/generated", DEFAULT_ITEM_MODEL)
+            self._post_load_models(models)
+
+        if "tag" in names or "recipe" in names:
+            self._post_load_tags()
+
+        # Plans reference models and expanded tags, those changes recompile all of them
+        if models or "tag" in names:
+            self.recipes = {name: copy.copy(r) for name, r in self.recipes.items()}
+            self._post_load_plans()
         else:
-            self.cache.mkdir(parents=True, exist_ok=True)
-            repo = Repo.clone_from(repo, cache_dir)
-            repo.git.checkout(tag)
+            for name in names.get("recipe", ()):
+                if name in self.recipes:
+                    self.recipes[name].compile_plan(self, name)
 
-        self.scan_resources(cache_dir)
+        if "tag" in names or "recipe" in names:
+            self._post_load_recipe_indexes()
+
+        if self.texture_atlas:
+            self._post_load_texture_atlases()
+
+    def item_fingerprint(self, location: str) -> str:
+        """
+        Identify the resources an item is rendered from. Items not affected by a reload
+        keep their fingerprint, so their renders stay cached.
+        """
+        if ";" in location or location.startswith("#"):
+            return self.fingerprint
+
+        namespace, path = location.split(":", 1)
+        keys = {
+            f"model:{namespace}:{prefix}{path}{suffix}"
+            for prefix, suffix in ITEM_MODEL_PATTERNS
+        }
+        keys.add(f"colors:{namespace}")
+        model = self.get_model(location)
+        seen = set()
+        while model is not None and model.location not in seen:
+            seen.add(model.location)
+            keys.add(f"model:{model.location}")
+            keys.update(f"texture:{t}" for t in model.textures.values())
+            model = self.models.get(model.parent) if model.parent else None
+
+        changes = sorted(
+            (key, self.resource_fingerprints[key])
+            for key in keys
+            if key in self.resource_fingerprints
+        )
+        if not changes:
+            return self.loaded_fingerprint
+        return hashlib.sha256(
+            json.dumps([self.loaded_fingerprint, changes]).encode()
+        ).hexdigest()
+
+    def changed_items(self, previous: "ResourceManager") -> list[str]:
+        """
+        :param previous: The manager this one was reloaded from.
+        :return: The items whose resources differ between both managers.
+        """
+        locations = set()
+        for manager in (previous, self):
+            for name in manager.models:
+                namespace, path = name.split(":", 1)
+                for prefix, suffix in ITEM_MODEL_PATTERNS:
+                    if path.startswith(prefix) and path.endswith(suffix):
+                        stem = path[len(prefix) : len(path) - len(suffix)]
+                        locations.add(f"{namespace}:{stem}")
+        return sorted(
+            location
+            for location in locations
+            if self.item_fingerprint(location) != previous.item_fingerprint(location)
+        )
 
     def get_lang(self, location: str) -> str:
         return self.lang.get(
@@ -0,0 +1,104 @@
+import os
+from pathlib import Path
+from typing import Iterator
+
+# Directories which never contain source resources, skipped when searching for them
+PRUNED_DIRECTORIES = {"build", "run", "out", "bin", "node_modules", "__pycache__"}
+
+# What is loaded from a namespace, in load order. Directories map to nested rules,
+# or to the category of all files below them, single files map to their category.
+DATA_LAYOUT = {
+    "recipe": "recipe",
+    "recipes": "recipe",
+    "tags": {"item": "tag", "items": "tag"},
+}
+ASSETS_LAYOUT = {
+    "models": "model",
+    "lang": {"en_us.json": "lang"},
+    "textures": "texture",
+    "default_item_colors.json": "colors",
+}
+
+CATEGORY_EXTENSIONS = {
+    "recipe": ".json",
+    "tag": ".json",
+    "model": ".json",
+    "texture": ".png",
+}
+
+
+def _scandir(path: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(path) as it:
+            return sorted(it, key=lambda e: e.name)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def find_resource_roots(path: Path) -> Iterator[Path]:
+    """
+    Find all directories named resources, without descending into hidden directories,
+    build outputs, run directories or dependency caches.
+    """
+    for entry in _scandir(str(path)):
+        if (
+            not entry.is_dir(follow_symlinks=False)
+            or entry.name.startswith(".")
+            or entry.name in PRUNED_DIRECTORIES
+        ):
+            continue
+        if entry.name == "resources":
+            yield Path(entry.path)
+        else:
+            yield from find_resource_roots(Path(entry.path))
+
+
+def _walk_category(
+    path: str, category: str, namespace: str
+) -> Iterator[tuple[str, Path, str]]:
+    extension = CATEGORY_EXTENSIONS[category]
+    stack = [(path, "")]
+    while stack:
+        path, prefix = stack.pop()
+        directories = []
+        for entry in _scandir(path):
+            if entry.is_dir():
+                directories.append((entry.path, prefix + entry.name + "/"))
+            elif entry.name.endswith(extension):
+                name = namespace + ":" + prefix + entry.name[: -len(extension)]
+                yield category, Path(entry.path), name
+        # Depth first, in name order
+        stack.extend(reversed(directories))
+
+
+def _walk_layout(
+    path: str, layout: dict, namespace: str
+) -> Iterator[tuple[str, Path, str]]:
+    entries = {entry.name: entry for entry in _scandir(path)}
+    for name, rule in layout.items():
+        entry = entries.get(name)
+        if entry is None:
+            continue
+        if isinstance(rule, dict):
+            yield from _walk_layout(entry.path, rule, namespace)
+        elif rule in CATEGORY_EXTENSIONS:
+            if entry.is_dir():
+                yield from _walk_category(entry.path, rule, namespace)
+        elif entry.is_file():
+            yield rule, Path(entry.path), namespace
+
+
+def walk_resources(root: Path) -> Iterator[tuple[str, Path, str]]:
+    """
+    Classify the files of a resource pack in a single traversal, directories without
+    loadable files, like loot tables or sounds, are never entered.
+    :param root: The root of the pack, containing assets, data, ...
+    :return: The category, path and resource name of each file, in load order.
+    """
+    data = {e.name: e.path for e in _scandir(str(root / "data")) if e.is_dir()}
+    assets = {e.name: e.path for e in _scandir(str(root / "assets")) if e.is_dir()}
+    for namespace in sorted(data.keys() | assets.keys()):
+        if namespace in data:
+            yield from _walk_layout(data[namespace], DATA_LAYOUT, namespace)
+        if namespace in assets:
+            yield from _walk_layout(assets[namespace], ASSETS_LAYOUT, namespace)
@@ -0,0 +1,61 @@
+import sys
+from collections.abc import Mapping
+from typing import Iterator
+
+import numpy as np
+
+
+class TagIndex(Mapping):
+    """
+    Expanded tags, stored as sorted arrays of interned item ids instead of string sets.
+    Behaves like a read-only mapping from tag name to its sorted items, and additionally
+    answers which tags contain an item without scanning all of them.
+    """
+
+    def __init__(self, tags: dict[str, set[str]]):
+        # Item ids follow the sorted item names, so sorted ids yield sorted items
+        self.items: list[str] = [
+            sys.intern(item) for item in sorted(set().union(*tags.values()))
+        ]
+        self.ids: dict[str, int] = {item: i for i, item in enumerate(self.items)}
+
+        self.names: list[str] = [sys.intern(name) for name in sorted(tags)]
+        self.members: dict[str, np.ndarray] = {
+            name: np.array(
+                sorted(self.ids[item] for item in tags[name]), dtype=np.uint32
+            )
+            for name in self.names
+        }
+
+        # Reverse index in CSR form, the tags of item i are at offsets[i]:offsets[i + 1]
+        members = [self.members[name] for name in self.names]
+        flat = np.concatenate(members) if members else np.empty(0, dtype=np.uint32)
+        owners = np.repeat(
+            np.arange(len(self.names), dtype=np.uint32), [len(m) for m in members]
+        )
+        order = np.argsort(flat, kind="stable")
+        self.item_tags = owners[order]
+        self.offsets = np.searchsorted(flat[order], np.arange(len(self.items) + 1))
+
+    def __getitem__(self, name: str) -> list[str]:
+        return [self.items[i] for i in self.members[name]]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.members
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def tags_of(self, item: str) -> list[str]:
+        """
+        :return: The sorted names of all tags containing the item.
+        """
+        i = self.ids.get(item)
+        if i is None:
+            return []
+        return [
+            self.names[t] for t in self.item_tags[self.offsets[i] : self.offsets[i + 1]]
+        ]
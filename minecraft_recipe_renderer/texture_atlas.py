@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+from PIL import Image
+
+# Only these textures are packed, others like GUI or entity textures are loaded on demand
+ATLAS_PREFIXES = ("item/", "block/")
+
+ATLAS_MIN_WIDTH = 2048
+
+
+def atlas_textures(files: Iterable[tuple[str, Path, str]]) -> dict[str, Path]:
+    """
+    Select the item and block textures of a dependency, including those overridden by
+    later dependencies, so the atlas only depends on the dependency itself.
+    :param files: The category, path and name of each file of the dependency, in load order.
+    """
+    return {
+        name: path
+        for category, path, name in files
+        if category == "texture" and name.split(":", 1)[-1].startswith(ATLAS_PREFIXES)
+    }
+
+
+def atlas_paths(root: Path) -> tuple[Path, Path]:
+    """
+    :return: The pixel and index file of the atlas stored next to a dependency directory.
+    """
+    return (
+        root.with_name(root.name + ".atlas.npy"),
+        root.with_name(root.name + ".atlas.json"),
+    )
+
+
+def fingerprint(textures: dict[str, Path]) -> str:
+    h = hashlib.sha256()
+    for name in sorted(textures):
+        stat = textures[name].stat()
+        h.update(
+            f"{name}\0{textures[name]}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode()
+        )
+    return h.hexdigest()
+
+
+class TextureAtlas:
+    """
+    All textures of a dependency decoded once and shelf-packed into a single RGBA array.
+    Persisted as a raw .npy file, which is memory mapped when loaded again.
+    """
+
+    def __init__(self, pixels: np.ndarray, rects: dict[str, tuple[int, int, int, int]]):
+        self.pixels = pixels
+        self.rects = rects
+
+    def __contains__(self, location: str) -> bool:
+        return location in self.rects
+
+    def get(self, location: str) -> Optional[np.ndarray]:
+        """
+        :return: A view of the texture's pixels, without copying them.
+        """
+        rect = self.rects.get(location)
+        if rect is None:
+            return None
+        x, y, w, h = rect
+        return self.pixels[y : y + h, x : x + w]
+
+    @staticmethod
+    def build(textures: dict[str, Path]) -> "TextureAtlas":
+        images = {}
+        for name, path in textures.items():
+            try:
+                images[name] = np.asarray(Image.open(path).convert("RGBA"))
+            except Exception:
+                print(f"Error loading texture: {name}")
+
+        width = max([ATLAS_MIN_WIDTH] + [i.shape[1] for i in images.values()])
+
+        # Shelf packing, tallest textures first
+        rects = {}
+        x = y = shelf_height = 0
+        for name in sorted(images, key=lambda n: (-images[n].shape[0], n)):
+            h, w = images[name].shape[:2]
+            if x + w > width:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            rects[name] = (x, y, w, h)
+            x += w
+            shelf_height = max(shelf_height, h)
+
+        pixels = np.zeros((y + shelf_height, width, 4), dtype=np.uint8)
+        for name, (x, y, w, h) in rects.items():
+            pixels[y : y + h, x : x + w] = images[name]
+        return TextureAtlas(pixels, rects)
+
+    def save(self, root: Path, digest: str):
+        pixels_path, index_path = atlas_paths(root)
+        tmp = pixels_path.with_name(f"{pixels_path.name}.{os.getpid()}.tmp")
+        with tmp.open("wb") as f:
+            np.save(f, self.pixels)
+        os.replace(tmp, pixels_path)
+
+        # The index is written last, its fingerprint marks the atlas as complete
+        tmp = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"fingerprint": digest, "rects": self.rects}))
+        os.replace(tmp, index_path)
+
+    @staticmethod
+    def load(root: Path, digest: str) -> Optional["TextureAtlas"]:
+        pixels_path, index_path = atlas_paths(root)
+        try:
+            index = json.loads(index_path.read_text())
+            if index["fingerprint"] != digest:
+                return None
+            pixels = np.load(pixels_path, mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        return TextureAtlas(pixels, {k: tuple(v) for k, v in index["rects"].items()})
+
+    @staticmethod
+    def load_or_build(
+        root: Path, files: Iterable[tuple[str, Path, str]]
+    ) -> "TextureAtlas":
+        """
+        Load the atlas stored next to the dependency directory, or build and store it.
+        """
+        textures = atlas_textures(files)
+        digest = fingerprint(textures)
+        atlas = TextureAtlas.load(root, digest)
+        if atlas is None:
+            atlas = TextureAtlas.build(textures)
+            atlas.save(root, digest)
+            # Map the stored copy, so the pages are shared with other processes
+            atlas = TextureAtlas.load(root, digest) or atlas
+        return atlas
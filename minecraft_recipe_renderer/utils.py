@@ -1,5 +1,9 @@
+import sys
+from types import ModuleType, FunctionType
 from typing import Union
 
+import numpy as np
+
 
 def to_location(item: Union[str, dict]):
     if isinstance(item, str):
@@ -25,3 +29,41 @@ def to_ingredient(ingredient: Union[Union[str, dict], list[Union[str, dict]]]):
 
 def to_path(location: str) -> str:
     return location.split(":", 1)[-1]
+
+
+def deep_getsizeof(obj: object) -> int:
+    """
+    Approximate the memory footprint of an object graph in bytes.
+    Shared objects are counted once, modules, classes and functions are skipped.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(o))
+
+        size += sys.getsizeof(o)
+
+        if isinstance(o, np.ndarray):
+            # Views do not own their data, count the base instead
+            if o.base is not None:
+                stack.append(o.base)
+            continue
+
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+        elif not isinstance(o, (str, bytes, int, float, bool)):
+            if hasattr(o, "__dict__"):
+                stack.append(o.__dict__)
+            for cls in type(o).__mro__:
+                slots = cls.__dict__.get("__slots__", ())
+                for slot in (slots,) if isinstance(slots, str) else slots:
+                    if slot not in ("__dict__", "__weakref__") and hasattr(o, slot):
+                        stack.append(getattr(o, slot))
+    return size
@@ -0,0 +1,302 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from minecraft_recipe_renderer import ResourceManager, ItemRenderer
+from minecraft_recipe_renderer.encoding import encode_animation, encode_image
+from minecraft_recipe_renderer.recipes.recipe import RenderPlan
+from minecraft_recipe_renderer.resource_manager import parse_dependencies
+
+# Bumped whenever rendering changes in a way that invalidates previous outputs
+RENDER_VERSION = 2
+
+_manager: Optional[ResourceManager] = None
+
+
+def load(cache: Path, dependencies: list[str]) -> ResourceManager:
+    manager = ResourceManager(cache)
+    manager.load_dependencies(dependencies)
+    manager.post_load()
+    return manager
+
+
+def _init_worker(cache: Path, dependencies: list[str]):
+    global _manager
+    # Forked workers inherit the already loaded manager
+    if _manager is None:
+        _manager = load(cache, dependencies)
+
+
+def _state(o: object):
+    if isinstance(o, RenderPlan):
+        # Derived from the recipe and the models, which are fingerprinted on their own
+        return None
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, (set, frozenset)):
+        return sorted(o)
+    if hasattr(o, "__dict__"):
+        return vars(o)
+    return {
+        slot: getattr(o, slot)
+        for cls in type(o).__mro__
+        for slot in cls.__dict__.get("__slots__", ())
+        if hasattr(o, slot)
+    }
+
+
+def digest(*parts) -> str:
+    return hashlib.sha256(
+        json.dumps(parts, default=_state, sort_keys=True).encode()
+    ).hexdigest()
+
+
+class Fingerprints:
+    """
+    Computes digests over everything an output depends on, used to skip unchanged outputs.
+    """
+
+    def __init__(self, manager: ResourceManager, resolution: int, animated: bool):
+        self.manager = manager
+        self.resolution = resolution
+        self.animated = animated
+        self.items: dict[str, Optional[str]] = {}
+
+    def item(self, location: str) -> Optional[str]:
+        if location not in self.items:
+            model = self.manager.get_model(location)
+            if model is None:
+                self.items[location] = None
+            else:
+                textures = {
+                    t: self.manager.texture_digests[t]
+                    for t in model.textures.values()
+                    if t in self.manager.texture_digests
+                }
+                self.items[location] = digest(
+                    RENDER_VERSION,
+                    location,
+                    model,
+                    textures,
+                    self.manager.default_item_colors.get(location),
+                    self.resolution,
+                )
+        return self.items[location]
+
+    def recipe(self, name: str) -> str:
+        recipe = self.manager.recipes[name]
+
+        # Every item the recipe may show, following tags
+        strings = set()
+        stack = [vars(recipe)]
+        while stack:
+            o = stack.pop()
+            if isinstance(o, str):
+                strings.add(o)
+            elif isinstance(o, dict):
+                stack.extend(o.values())
+            elif isinstance(o, (list, tuple)):
+                stack.extend(o)
+            elif hasattr(o, "__dict__"):
+                stack.append(vars(o))
+        items = {
+            i
+            for s in strings
+            for i in (self.manager.tags.get(s[1:], []) if s.startswith("#") else [s])
+        }
+
+        return digest(
+            RENDER_VERSION,
+            name,
+            type(recipe).__name__,
+            recipe,
+            {i: self.item(i) for i in sorted(items) if ":" in i},
+            (
+                self.manager.get_lang(recipe.result.id)
+                if hasattr(recipe, "result")
+                else ""
+            ),
+            self.resolution,
+            self.animated,
+        )
+
+
+def render_item(location: str, target: Path, resolution: int):
+    renderer = ItemRenderer(_manager)
+    texture = renderer.render(_manager.get_model(location), resolution)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(encode_image(texture))
+
+
+def render_recipe(name: str, target: Path, resolution: int, animated: bool) -> Path:
+    renderer = ItemRenderer(_manager)
+    images = _manager.recipes[name].render(
+        renderer,
+        resolution // 16,
+        max_variations=10 if animated else 1,
+        print_name=True,
+    )
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if len(images) > 1:
+        target = target.with_suffix(".gif")
+        target.write_bytes(encode_animation(images, "gif", duration=1000))
+    elif images:
+        target.write_bytes(encode_image(images[0]))
+    else:
+        raise ValueError(f"Recipe {name} has nothing to render")
+    return target
+
+
+def in_namespaces(location: str, namespaces: list[str]) -> bool:
+    return not namespaces or location.split(":", 1)[0] in namespaces
+
+
+def find_items(manager: ResourceManager, namespaces: list[str]) -> list[str]:
+    items = set()
+    for name in manager.models:
+        namespace, path = name.split(":", 1)
+        for prefix, suffix in (
+            ("item/", "_00"),
+            ("item/", ""),
+            ("block/", "_inventory"),
+            ("block/", ""),
+        ):
+            if path.startswith(prefix) and path.endswith(suffix):
+                location = namespace + ":" + path[len(prefix) : len(path) - len(suffix)]
+                if in_namespaces(location, namespaces) and manager.get_model(location):
+                    items.add(location)
+    return sorted(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-render every item and recipe of the given namespaces."
+    )
+    parser.add_argument("output", type=Path, help="The output directory.")
+    parser.add_argument("--minecraft-version", default="1.20.1")
+    parser.add_argument(
+        "--dependencies",
+        default="",
+        help="A semicolon separated list of repository or JAR URLs.",
+    )
+    parser.add_argument(
+        "--namespace",
+        action="append",
+        default=[],
+        help="Only render this namespace, can be given multiple times.",
+    )
+    parser.add_argument("--resolution", type=int, default=64)
+    parser.add_argument(
+        "--animated", action="store_true", help="Render recipe variations as GIF."
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", type=Path, default=Path("cache/mcr/"))
+    args = parser.parse_args()
+
+    if args.resolution % 16 != 0:
+        parser.error("Resolution must be a multiple of 16.")
+
+    global _manager
+    dependencies = parse_dependencies(args.minecraft_version, args.dependencies)
+    _manager = load(args.cache, dependencies)
+    fingerprints = Fingerprints(_manager, args.resolution, args.animated)
+
+    manifest_path = args.output / "manifest.json"
+    previous = (
+        json.loads(manifest_path.read_text())
+        if manifest_path.exists()
+        else {"items": {}, "recipes": {}}
+    )
+    manifest = {
+        "dependencies": dependencies,
+        "resolution": args.resolution,
+        "animated": args.animated,
+        "items": {},
+        "recipes": {},
+    }
+
+    def unchanged(kind: str, name: str, digest_: str) -> bool:
+        entry = previous.get(kind, {}).get(name)
+        return (
+            entry is not None
+            and entry["digest"] == digest_
+            and (args.output / entry["file"]).exists()
+        )
+
+    # Forked workers share the loaded manager, others load it once on start
+    context = multiprocessing.get_context(
+        "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    )
+    skipped = 0
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(args.cache, dependencies),
+    ) as executor:
+        futures = {}
+
+        for location in find_items(_manager, args.namespace):
+            d = fingerprints.item(location)
+            if unchanged("items", location, d):
+                manifest["items"][location] = previous["items"][location]
+                skipped += 1
+                continue
+            target = args.output / "items" / (location.replace(":", "/") + ".png")
+            future = executor.submit(render_item, location, target, args.resolution)
+            futures[future] = ("items", location, d, target)
+
+        for name in sorted(_manager.recipes):
+            if not in_namespaces(name, args.namespace):
+                continue
+            d = fingerprints.recipe(name)
+            if unchanged("recipes", name, d):
+                manifest["recipes"][name] = previous["recipes"][name]
+                skipped += 1
+                continue
+            target = args.output / "recipes" / (name.replace(":", "/") + ".png")
+            future = executor.submit(
+                render_recipe, name, target, args.resolution, args.animated
+            )
+            futures[future] = ("recipes", name, d, target)
+
+        for future, (kind, name, d, target) in futures.items():
+            try:
+                target = future.result() or target
+            except Exception as e:
+                print(f"Failed to render {name}: {e}")
+                continue
+            manifest[kind][name] = {
+                "file": target.relative_to(args.output).as_posix(),
+                "digest": d,
+            }
+
+    # Outputs of items and recipes which disappeared, or changed their file name
+    current = {
+        entry["file"]
+        for kind in ("items", "recipes")
+        for entry in manifest[kind].values()
+    }
+    removed = 0
+    for kind in ("items", "recipes"):
+        for entry in previous.get(kind, {}).values():
+            if entry["file"] not in current:
+                (args.output / entry["file"]).unlink(missing_ok=True)
+                removed += 1
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    print(
+        f"Rendered {len(futures)} outputs, skipped {skipped} unchanged, removed {removed} stale, "
+        f"{len(manifest['items'])} items and {len(manifest['recipes'])} recipes in total."
+    )
+
+
+if __name__ == "__main__":
+    main()
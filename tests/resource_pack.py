@@ -0,0 +1,184 @@
+import hashlib
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image, ImageFont
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from minecraft_recipe_renderer import api
+from minecraft_recipe_renderer.classes import canvas
+from minecraft_recipe_renderer.disk_cache import DiskCache
+from minecraft_recipe_renderer.generations import Generations
+from minecraft_recipe_renderer.manager_cache import ManagerCache
+from minecraft_recipe_renderer.resource_manager import parse_dependencies
+
+ITEMS = ["iron_ingot", "gold_ingot", "stick", "diamond", "oak_log", "birch_log"]
+BLOCKS = ["oak_planks", "birch_planks", "stone"]
+
+TAGS = {
+    "logs": ["minecraft:oak_log", "minecraft:birch_log"],
+    "planks": ["minecraft:oak_planks", "minecraft:birch_planks"],
+    "wood": ["#minecraft:logs", "#minecraft:planks"],
+}
+
+# Enough recipes to fill several rows
+BULK_RECIPES = 24
+
+
+def write_json(path: Path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data))
+
+
+def write_texture(path: Path, seed: str):
+    # A few colors in a pattern, with transparent pixels
+    digest = hashlib.sha256(seed.encode()).digest()
+    image = Image.new("RGBA", (16, 16))
+    for x in range(16):
+        for y in range(16):
+            value = digest[(x * 16 + y) % len(digest)]
+            alpha = 0 if (x + y) % 5 == 0 else 255
+            image.putpixel((x, y), (value & 0xC0, (value << 2) & 0xC0, value, alpha))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path)
+
+
+def build(cache: Path) -> Path:
+    """
+    Write a small vanilla resource pack where the dependency cache expects the
+    extracted client JAR of the default version, so nothing is downloaded.
+    :return: The dependency directory.
+    """
+    (url,) = parse_dependencies("1.20.1", "")
+    root = cache / hashlib.sha256(url.encode()).hexdigest()
+    assets = root / "assets/minecraft"
+    data = root / "data/minecraft"
+
+    write_json(
+        assets / "models/block/block.json",
+        {
+            "display": {
+                "gui": {
+                    "rotation": [30, 225, 0],
+                    "translation": [0, 0, 0],
+                    "scale": [0.625, 0.625, 0.625],
+                }
+            },
+            "gui_light": "side",
+        },
+    )
+    write_json(
+        assets / "models/block/cube_all.json",
+        {
+            "parent": "block/block",
+            "elements": [
+                {
+                    "from": [0, 0, 0],
+                    "to": [16, 16, 16],
+                    "faces": {
+                        face: {"texture": "#all", "uv": [0, 0, 16, 16]}
+                        for face in ("north", "south", "up", "down", "west", "east")
+                    },
+                }
+            ],
+        },
+    )
+    write_json(assets / "models/item/generated.json", {"parent": "builtin/generated"})
+    for item in ITEMS:
+        write_texture(assets / f"textures/item/{item}.png", item)
+        write_json(
+            assets / f"models/item/{item}.json",
+            {"parent": "item/generated", "textures": {"layer0": f"item/{item}"}},
+        )
+    for block in BLOCKS:
+        write_texture(assets / f"textures/block/{block}.png", block)
+        write_json(
+            assets / f"models/block/{block}.json",
+            {"parent": "block/cube_all", "textures": {"all": f"block/{block}"}},
+        )
+        write_json(
+            assets / f"models/item/{block}.json",
+            {"parent": f"minecraft:block/{block}"},
+        )
+    write_json(assets / "lang/en_us.json", {"item.minecraft.iron_ingot": "Iron Ingot"})
+
+    for name, values in TAGS.items():
+        write_json(data / f"tags/items/{name}.json", {"values": values})
+    write_json(
+        data / "recipes/stick.json",
+        {
+            "type": "minecraft:crafting_shaped",
+            "pattern": ["#", "#"],
+            "key": {"#": {"tag": "minecraft:planks"}},
+            "result": {"item": "minecraft:stick", "count": 4},
+        },
+    )
+    write_json(
+        data / "recipes/oak_planks.json",
+        {
+            "type": "minecraft:crafting_shapeless",
+            "ingredients": [{"tag": "minecraft:logs"}],
+            "result": {"item": "minecraft:oak_planks", "count": 4},
+        },
+    )
+    for n in range(BULK_RECIPES):
+        write_json(
+            data / f"recipes/bulk_{n:02}.json",
+            {
+                "type": "minecraft:crafting_shaped",
+                "pattern": ["##", "##"],
+                "key": {"#": {"tag": "minecraft:wood"}},
+                "result": {"item": "minecraft:" + ITEMS[n % len(ITEMS)]},
+            },
+        )
+    return root
+
+
+class ApiTestCase(unittest.TestCase):
+    """
+    Serves the API from a fresh dependency cache holding the test resource pack, with
+    an in-memory response cache and no Redis.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        cache = Path(self.directory.name)
+        self.root = build(cache)
+
+        # The Minecraft font is downloaded, text is drawn with the one bundled with Pillow
+        patcher = mock.patch.object(
+            canvas, "get_font", lambda size=10, **_: ImageFont.load_default(size)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for name, value in {
+            "dependency_cache": DiskCache(cache),
+            "manager_cache": ManagerCache(
+                api.MANAGER_CACHE_BYTES, api.MANAGER_CACHE_TTL
+            ),
+            "generations": Generations("test", api.GENERATION_TTL),
+        }.items():
+            patcher = mock.patch.object(api, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # Layouts are cached by the content of the manager, which is the same in every test
+        api.layout_recipes.cache.clear()
+
+        app = FastAPI()
+        api.setup(app)
+        # Responses of other tests must not be served
+        FastAPICache.reset()
+        FastAPICache.init(InMemoryBackend(), prefix=self.id())
+        self.addCleanup(FastAPICache.reset)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.directory.cleanup()
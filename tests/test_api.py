@@ -0,0 +1,180 @@
+import io
+import shutil
+import unittest
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+from minecraft_recipe_renderer import api
+from minecraft_recipe_renderer.resource_manager import (
+    ResourceManager,
+    parse_dependencies,
+)
+from resource_pack import BULK_RECIPES, TAGS, ApiTestCase, write_texture
+from test_tags import expand
+
+
+def pixels(content: bytes) -> np.ndarray:
+    return np.asarray(Image.open(io.BytesIO(content)).convert("RGBA"))
+
+
+class ManagerTest(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = api.load_manager(parse_dependencies("1.20.1", ""))
+
+    def test_tags_match_dict_expansion(self):
+        expanded = expand(
+            {"minecraft:" + name: values for name, values in TAGS.items()}
+        )
+        # The pseudo tag of all recipe outputs
+        expanded["minecraft:recipes"] = {
+            r.result.id for r in self.manager.recipes.values()
+        }
+        self.assertEqual(
+            {name: self.manager.tags[name] for name in self.manager.tags},
+            {name: sorted(items) for name, items in expanded.items()},
+        )
+        self.assertEqual(
+            self.manager.tags.tags_of("minecraft:oak_planks"),
+            sorted(
+                name
+                for name, items in expanded.items()
+                if "minecraft:oak_planks" in items
+            ),
+        )
+
+    def test_recipes_using_follows_tags(self):
+        self.assertEqual(
+            self.manager.recipes_using("minecraft:oak_log"),
+            sorted(
+                ["minecraft:oak_planks"]
+                + [f"minecraft:bulk_{n:02}" for n in range(BULK_RECIPES)]
+            ),
+        )
+
+    def test_pages(self):
+        names = api.match_recipes(self.manager, "minecraft:.*")
+        width, height = self.manager.recipes[names[0]].get_size()
+        # Two crafting grids per row, a third row would start below the height limit
+        with mock.patch.object(api, "MAX_SHEET_HEIGHT", height):
+            pages = api.layout_recipes.__wrapped__(
+                self.manager, "minecraft:.*", 16, 2 * width, False, 1
+            )
+
+        contents = [
+            [name for row in page.rows for name, _, _ in row.recipes] for page in pages
+        ]
+        self.assertEqual(len(pages), (len(names) + 3) // 4)
+        self.assertEqual([name for page in contents for name in page], names)
+        self.assertTrue(all(len(page) == 4 for page in contents[:-1]))
+        for page in pages:
+            self.assertEqual(page.rows[0].y, 0)
+            self.assertTrue(all(len(row.recipes) <= 2 for row in page.rows))
+
+
+class RecipesEndpointTest(ApiTestCase):
+    def test_page_count_and_contents(self):
+        query = "/recipes?locations=minecraft:.*&resolution=64&row_width=864"
+        with mock.patch.object(api, "MAX_SHEET_HEIGHT", 248):
+            first = self.client.get(query)
+            pages = int(first.headers["x-total-pages"])
+            sheets = [first] + [
+                self.client.get(f"{query}&page={page}") for page in range(2, pages + 1)
+            ]
+            missing = self.client.get(f"{query}&page={pages + 1}")
+
+        # Two rows of two crafting grids per page
+        self.assertEqual(pages, (BULK_RECIPES + 2 + 3) // 4)
+        self.assertEqual(missing.status_code, 422)
+        self.assertTrue(all(s.status_code == 200 for s in sheets))
+        self.assertEqual(len({s.headers["etag"] for s in sheets}), pages)
+        self.assertEqual(
+            {pixels(s.content).shape for s in sheets[:-1]}, {(496, 864, 4)}
+        )
+        # The last page holds the smaller shapeless recipe and the stick
+        self.assertEqual(pixels(sheets[-1].content).shape, (248, 792, 4))
+
+    def test_streamed_png_matches_buffered(self):
+        query = "/recipes?locations=minecraft:.*&format=png"
+        buffered = self.client.get(query)
+        streamed = self.client.get(query + "&stream=true")
+
+        self.assertEqual(streamed.status_code, 200)
+        self.assertEqual(streamed.headers["content-type"], "image/png")
+        self.assertNotEqual(streamed.headers["etag"], buffered.headers["etag"])
+        np.testing.assert_array_equal(
+            pixels(streamed.content), pixels(buffered.content)
+        )
+
+    def test_not_modified(self):
+        response = self.client.get("/recipes?locations=minecraft:stick")
+        etag = response.headers["etag"]
+
+        cached = self.client.get(
+            "/recipes?locations=minecraft:stick", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.headers["etag"], etag)
+        self.assertEqual(cached.content, b"")
+
+        other = self.client.get(
+            "/recipes?locations=minecraft:stick", headers={"If-None-Match": '"other"'}
+        )
+        self.assertEqual(other.status_code, 200)
+
+
+class ReloadTest(ApiTestCase):
+    def etags(self) -> dict[str, str]:
+        return {
+            path: self.client.get(path).headers["etag"]
+            for path in (
+                "/item?location=minecraft:iron_ingot",
+                "/item?location=minecraft:stick",
+                "/item?location=minecraft:stone",
+                "/atlas?locations=minecraft:stick",
+            )
+        }
+
+    def test_reload_changes_only_affected_etags(self):
+        before = self.etags()
+
+        # The dependency moved, like a branch pointing to a new commit
+        updated = self.root.with_name("updated")
+        shutil.copytree(self.root, updated)
+        write_texture(updated / "assets/minecraft/textures/item/iron_ingot.png", "new")
+        with mock.patch.object(
+            ResourceManager, "fetch_dependency", lambda manager, url: updated
+        ):
+            response = self.client.post("/reload")
+            after = self.etags()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["changed"], 1)
+        self.assertNotEqual(
+            before["/item?location=minecraft:iron_ingot"],
+            after["/item?location=minecraft:iron_ingot"],
+        )
+        self.assertEqual(
+            before["/item?location=minecraft:stick"],
+            after["/item?location=minecraft:stick"],
+        )
+        self.assertEqual(
+            before["/item?location=minecraft:stone"],
+            after["/item?location=minecraft:stone"],
+        )
+        # Sheets of several items follow the generation of the whole set
+        self.assertNotEqual(
+            before["/atlas?locations=minecraft:stick"],
+            after["/atlas?locations=minecraft:stick"],
+        )
+
+    def test_reload_without_changes(self):
+        before = self.etags()
+        self.assertEqual(self.client.post("/reload").json()["changed"], 0)
+        self.assertEqual(self.etags(), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import hashlib
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from minecraft_recipe_renderer.download import download, expected_sha1
+
+# Several download chunks, so a cut off response leaves a partial file to resume
+CONTENT = bytes(range(256)) * 16384
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Serves CONTENT with Range support, optionally cutting off the first responses.
+    """
+
+    server: "Server"
+
+    def do_GET(self):
+        self.server.ranges.append(self.headers.get("Range"))
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].removeprefix("bytes=").split("-")[0])
+            if start >= len(CONTENT):
+                self.send_response(416)
+                self.end_headers()
+                return
+
+        body = CONTENT[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if self.server.truncations > 0:
+            # Promise the whole body but close the connection halfway through
+            self.server.truncations -= 1
+            self.wfile.write(body[: len(body) // 2])
+            self.close_connection = True
+        else:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.ranges: list = []
+        self.truncations = 0
+
+
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.server = Server()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/client.jar"
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.target = Path(self.directory.name) / "client.jar"
+        self.part = self.target.with_name("client.jar.part")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def test_full_download(self):
+        download(self.url, self.target, sha1=hashlib.sha1(CONTENT).hexdigest())
+
+        self.assertEqual(self.target.read_bytes(), CONTENT)
+        self.assertFalse(self.part.exists())
+        self.assertEqual(self.server.ranges, [None])
+
+    def test_resume_partial_download(self):
+        self.part.write_bytes(CONTENT[:1000])
+
+        download(self.url, self.target)
+
+        self.assertEqual(self.target.read_bytes(), CONTENT)
+        self.assertEqual(self.server.ranges, ["bytes=1000-"])
+
+    def test_checksum_mismatch(self):
+        with self.assertRaises(ValueError):
+            download(self.url, self.target, sha1="0" * 40)
+
+        self.assertFalse(self.target.exists())
+        self.assertFalse(self.part.exists())
+
+    def test_truncated_body_is_resumed(self):
+        self.server.truncations = 1
+
+        download(self.url, self.target, sha1=hashlib.sha1(CONTENT).hexdigest())
+
+        self.assertEqual(self.target.read_bytes(), CONTENT)
+        self.assertEqual(len(self.server.ranges), 2)
+        self.assertIsNone(self.server.ranges[0])
+        self.assertEqual(self.server.ranges[1], f"bytes={len(CONTENT) // 2}-")
+
+    def test_truncated_body_fails(self):
+        self.server.truncations = 100
+
+        with self.assertRaises(IOError):
+            download(self.url, self.target)
+
+        self.assertFalse(self.target.exists())
+
+    def test_expected_sha1(self):
+        self.assertEqual(
+            expected_sha1(
+                "https://piston-data.mojang.com/v1/objects/a7e5a6024bfd3cd614625aa05629adf760020304/client.jar"
+            ),
+            "a7e5a6024bfd3cd614625aa05629adf760020304",
+        )
+        self.assertIsNone(expected_sha1(self.url))
+
+
+if __name__ == "__main__":
+    unittest.main()
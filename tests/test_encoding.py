@@ -0,0 +1,86 @@
+import io
+import unittest
+
+import numpy as np
+from PIL import Image, ImageSequence
+
+from minecraft_recipe_renderer.encoding import encode_gif
+
+
+def image(*rectangles: tuple[int, int, int, int, tuple]) -> Image.Image:
+    pixels = np.zeros((40, 40, 4), dtype=np.uint8)
+    for x0, y0, x1, y1, color in rectangles:
+        pixels[y0:y1, x0:x1] = color
+    return Image.fromarray(pixels, "RGBA")
+
+
+def decode(data: bytes) -> list[np.ndarray]:
+    frames = []
+    for frame in ImageSequence.Iterator(Image.open(io.BytesIO(data))):
+        pixels = np.asarray(frame.convert("RGBA")).copy()
+        pixels[pixels[..., 3] == 0] = 0
+        frames.append(pixels)
+    return frames
+
+
+RED = (255, 0, 0, 255)
+GREEN = (0, 255, 0, 255)
+BLUE = (0, 0, 255, 255)
+
+
+class EncodeGifTest(unittest.TestCase):
+    def assertFrames(self, frames: list[Image.Image]):
+        decoded = decode(encode_gif(frames, 1000))
+        self.assertEqual(len(decoded), len(frames))
+        for actual, expected in zip(decoded, frames):
+            np.testing.assert_array_equal(actual, np.asarray(expected))
+
+    def test_changed_regions(self):
+        self.assertFrames(
+            [
+                image((0, 0, 40, 40, RED), (5, 5, 10, 10, GREEN)),
+                image((0, 0, 40, 40, RED), (5, 5, 10, 10, BLUE)),
+                image(
+                    (0, 0, 40, 40, RED), (5, 5, 10, 10, BLUE), (30, 30, 35, 35, GREEN)
+                ),
+            ]
+        )
+
+    def test_pixels_turning_transparent(self):
+        self.assertFrames([image((0, 0, 40, 20, RED)), image((0, 20, 40, 40, GREEN))])
+
+    def test_pixels_turning_transparent_when_looping(self):
+        self.assertFrames(
+            [
+                image((0, 0, 40, 20, RED)),
+                image((0, 0, 40, 20, RED), (0, 30, 40, 40, BLUE)),
+            ]
+        )
+
+    def test_identical_frames(self):
+        self.assertFrames([image((0, 0, 20, 20, RED))] * 3)
+
+    def test_only_changed_region_is_stored(self):
+        frames = [
+            image((0, 0, 40, 40, RED)),
+            image((0, 0, 40, 40, RED), (8, 4, 12, 6, BLUE)),
+        ]
+        second = ImageSequence.Iterator(
+            Image.open(io.BytesIO(encode_gif(frames, 1000)))
+        )[1]
+        self.assertEqual(second.dispose_extent, (8, 4, 12, 6))
+
+    def test_too_many_colors(self):
+        rng = np.random.default_rng(0)
+        colors = rng.integers(0, 256, (400, 4), dtype=np.uint8)
+        colors[:, 3] = 255
+        frame = Image.fromarray(colors[rng.integers(0, 400, (40, 40))], "RGBA")
+
+        (decoded,) = decode(encode_gif([frame], 1000))
+        self.assertEqual(decoded.shape, (40, 40, 4))
+        self.assertTrue((decoded[..., 3] == 255).all())
+        self.assertLessEqual(len(np.unique(decoded.reshape(-1, 4), axis=0)), 255)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+from minecraft_recipe_renderer.tags import TagIndex
+
+
+def expand(definitions: dict[str, list[str]]) -> dict[str, set[str]]:
+    """
+    The plain dict expansion, following #tag references.
+    """
+
+    def members(name: str, seen: frozenset) -> set[str]:
+        items = set()
+        for value in definitions.get(name, []):
+            if value.startswith("#"):
+                if value[1:] not in seen:
+                    items |= members(value[1:], seen | {value[1:]})
+            else:
+                items.add(value)
+        return items
+
+    return {name: members(name, frozenset([name])) for name in definitions}
+
+
+class TagIndexTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        items = [f"minecraft:item_{i}" for i in range(200)]
+        names = [f"minecraft:tag_{i}" for i in range(40)]
+        self.definitions = {
+            name: rng.sample(items, rng.randint(0, 20))
+            + ["#" + t for t in rng.sample(names[:i], min(i, rng.randint(0, 2)))]
+            for i, name in enumerate(names)
+        }
+        self.expanded = expand(self.definitions)
+        self.index = TagIndex(self.expanded)
+        self.items = items + ["minecraft:unknown"]
+
+    def test_mapping(self):
+        self.assertEqual(len(self.index), len(self.expanded))
+        self.assertEqual(list(self.index), sorted(self.expanded))
+        for name, items in self.expanded.items():
+            self.assertIn(name, self.index)
+            self.assertEqual(self.index[name], sorted(items))
+        self.assertNotIn("minecraft:unknown", self.index)
+        self.assertEqual(self.index.get("minecraft:unknown", []), [])
+
+    def test_tags_of(self):
+        for item in self.items:
+            self.assertEqual(
+                self.index.tags_of(item),
+                sorted(name for name, items in self.expanded.items() if item in items),
+            )
+
+    def test_empty(self):
+        index = TagIndex({})
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.tags_of("minecraft:stick"), [])
+
+    def test_empty_tag(self):
+        index = TagIndex({"minecraft:empty": set(), "minecraft:one": {"a:b"}})
+        self.assertEqual(index["minecraft:empty"], [])
+        self.assertEqual(index.tags_of("a:b"), ["minecraft:one"])
+
+
+if __name__ == "__main__":
+    unittest.main()